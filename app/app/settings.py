@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'core',
@@ -45,6 +46,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.HealthCheckMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,14 +84,85 @@ WSGI_APPLICATION = 'app.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db_pool',
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        # connections kept per worker process, see core/db_pool
+        'POOL': {
+            'SIZE': int(os.environ.get('DB_POOL_SIZE', 5)),
+            'OVERFLOW': int(os.environ.get('DB_POOL_OVERFLOW', 10)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            'IDLE_TIMEOUT': float(os.environ.get('DB_POOL_IDLE_TIMEOUT', 300)),
+            'PRE_PING': os.environ.get('DB_POOL_PRE_PING', '1') == '1',
+        },
+    }
+}
+
+# Read replicas, one alias per host in DB_REPLICA_HOSTS. Recipe, tag and
+# ingredient list and detail reads go to a replica unless the user wrote
+# in the last REPLICA_PIN_SECONDS, see core/db_router.py. Pins live in
+# the cache, which must be shared by all workers for them to hold. For
+# local testing, DB_REPLICA_NAME can point a "replica" at a second
+# database on the same server. Replicas get their own, never written, test
+# databases, so run core.tests.test_db_router alone with them set.
+DATABASE_REPLICAS = []
+for index, host in enumerate(
+        filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = dict(
+        DATABASES['default'], HOST=host.strip(),
+        NAME=os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']))
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'recipe-api'),
     }
 }
 
+RECIPE_LIST_CACHE_TIMEOUT = 300
+
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+
+# Failed logins allowed per account and per client address within the
+# window before /api/user/token/ answers 429 without checking passwords,
+# see user/throttling.py. 0 disables a limit.
+LOGIN_FAILURE_ACCOUNT_LIMIT = int(
+    os.environ.get('LOGIN_FAILURE_ACCOUNT_LIMIT', 5))
+LOGIN_FAILURE_IP_LIMIT = int(os.environ.get('LOGIN_FAILURE_IP_LIMIT', 50))
+LOGIN_FAILURE_WINDOW = int(os.environ.get('LOGIN_FAILURE_WINDOW', 900))
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/2.1/topics/auth/passwords/
+#
+# New passwords use the first hasher. Hashes from the others, or with
+# another PBKDF2 iteration count, are replaced on the next login, so the
+# cost can be tuned without invalidating existing passwords.
+
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 120000))
+
+PASSWORD_HASHERS = [
+    'user.hashers.PolicyPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -131,4 +206,45 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
-AUTH_USER_MODEL = 'core.User'
\ No newline at end of file
+# How recipe images are handed to the front proxy, see recipe/media.py:
+# 'x-accel-redirect' for nginx, 'x-sendfile' for Apache or lighttpd, or
+# empty to stream them from Django. For nginx, MEDIA_ROOT must be exposed
+# as an `internal` location at MEDIA_ACCEL_REDIRECT_PREFIX.
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get(
+    'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Requests above either threshold are logged by ServerTimingMiddleware
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', 50))
+
+# Recipe images are normalized and thumbnailed off-request, see
+# recipe/images.py
+RECIPE_IMAGE_WORKERS = int(os.environ.get('RECIPE_IMAGE_WORKERS', 2))
+RECIPE_THUMBNAIL_SIZE = (320, 320)
+# Uploads pending this long are processed again by a periodic
+# requeue_images, at startup nothing is in flight and it uses 0
+RECIPE_IMAGE_STALE_SECONDS = int(
+    os.environ.get('RECIPE_IMAGE_STALE_SECONDS', 300))
+
+# Threads running Django under app.asgi, see core/asgi.py. Safe requests
+# and writes get separate pools so slow uploads cannot starve reads.
+ASGI_READ_THREADS = int(os.environ.get('ASGI_READ_THREADS', 8))
+ASGI_WRITE_THREADS = int(os.environ.get('ASGI_WRITE_THREADS', 4))
+# Largest request body app.asgi spools before answering 413. Django's own
+# upload limits only apply once the whole body has been read.
+ASGI_MAX_BODY_SIZE = int(os.environ.get('ASGI_MAX_BODY_SIZE',
+                                        20 * 1024 * 1024))
+
+AUTH_USER_MODEL = 'core.User'
+
+# NUM_PROXIES is the number of trusted proxies in front of the app, whose
+# X-Forwarded-For entries give the client address. With 0 the header is
+# ignored, as clients can set it to anything.
+REST_FRAMEWORK = {
+    'PAGE_SIZE': 100,
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# Pagination classes are set per viewset, see recipe/pagination.py
+SILENCED_SYSTEM_CHECKS = ['rest_framework.W001']
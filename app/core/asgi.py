@@ -0,0 +1,255 @@
+import asyncio
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+RESPONSE_QUEUE_SIZE = 8
+
+
+class BodyTooLarge(Exception):
+    """The request body is over the handler's max_body_size"""
+
+
+def build_environ(scope, body, content_length):
+    """:return the WSGI environ of an ASGI http scope and buffered body"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').
+        encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+        environ['REMOTE_PORT'] = str(scope['client'][1])
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').lower()
+        value = value.decode('latin-1')
+        if name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        elif name == 'content-type':
+            key = 'CONTENT_TYPE'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        if key in environ:
+            # split cookie headers, as HTTP/2 sends them, join with ';'
+            separator = '; ' if key == 'HTTP_COOKIE' else ','
+            value = f'{environ[key]}{separator}{value}'
+        environ[key] = value
+
+    # chunked uploads have no length, but the body is complete by now
+    environ.setdefault('CONTENT_LENGTH', str(content_length))
+
+    return environ
+
+
+class AsgiHandler:
+    """
+    ASGI application serving a Django WSGI application.
+
+    Request bodies are read into a spooled file on the event loop and
+    responses are written back from it, so slow clients and slow uploads
+    only hold a coroutine. Django itself (views and ORM are synchronous
+    in this Django version) runs on threads once the request is
+    complete: reads on one pool and writes on another, so uploads can
+    never starve the list and detail endpoints.
+    """
+
+    def __init__(self, wsgi_application, read_threads=None,
+                 write_threads=None, max_body_size=None):
+        self.wsgi_application = wsgi_application
+        self.max_body_size = max_body_size or settings.ASGI_MAX_BODY_SIZE
+        self.read_executor = ThreadPoolExecutor(
+            read_threads or settings.ASGI_READ_THREADS,
+            thread_name_prefix='asgi-read')
+        self.write_executor = ThreadPoolExecutor(
+            write_threads or settings.ASGI_WRITE_THREADS,
+            thread_name_prefix='asgi-write')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope {scope['type']}")
+
+    async def lifespan(self, receive, send):
+        """Acknowledge startup and stop the thread pools on shutdown"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.read_executor.shutdown(wait=False)
+                self.write_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def declared_length(self, scope):
+        """:return the Content-Length of the request, or None"""
+        for name, value in scope.get('headers', []):
+            if name.lower() == b'content-length':
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+
+        return None
+
+    async def read_body(self, receive):
+        """
+        :return (spooled file, size) of the request body, or (None, 0)
+        when the client disconnects first. Raise BodyTooLarge as soon as
+        more than max_body_size bytes arrive.
+        """
+        body = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        size = 0
+
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None, 0
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_size:
+                body.close()
+                raise BodyTooLarge
+            body.write(chunk)
+            if not message.get('more_body', False):
+                break
+
+        body.seek(0)
+        return body, size
+
+    async def watch_disconnect(self, receive, cancelled):
+        """Set cancelled when the client goes away during the response"""
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                cancelled.set()
+                return
+
+    async def reject_too_large(self, send):
+        """Answer 413 without running the application"""
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'text/plain'),
+                        (b'connection', b'close')],
+        })
+        await send({'type': 'http.response.body',
+                    'body': b'Request body too large'})
+
+    def run_wsgi(self, environ, loop, queue, cancelled):
+        """
+        Run the WSGI application on a worker thread, passing the response
+        start and body chunks to the event loop. Blocks while the queue
+        is full so a streaming response follows the client's pace.
+        """
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            put(('start', int(status.split(' ', 1)[0]), headers))
+            return lambda data: put(('body', data))
+
+        try:
+            result = self.wsgi_application(environ, start_response)
+            try:
+                for chunk in result:
+                    if cancelled.is_set():
+                        break
+                    if chunk:
+                        put(('body', chunk))
+            finally:
+                # closing ends the request and releases its DB connection,
+                # which is thread local, so it must happen on this thread
+                if hasattr(result, 'close'):
+                    result.close()
+        finally:
+            put(None)
+
+    async def http(self, scope, receive, send):
+        """
+        Serve one HTTP request. Bodies over max_body_size are refused
+        before Django runs, and a client disconnecting stops a streaming
+        response at its next chunk.
+        """
+        length = self.declared_length(scope)
+        if length is not None and length > self.max_body_size:
+            await self.reject_too_large(send)
+            return
+
+        try:
+            body, size = await self.read_body(receive)
+        except BodyTooLarge:
+            await self.reject_too_large(send)
+            return
+        if body is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=RESPONSE_QUEUE_SIZE)
+        cancelled = threading.Event()
+        watcher = asyncio.ensure_future(
+            self.watch_disconnect(receive, cancelled))
+        executor = self.read_executor if scope['method'] in READ_METHODS \
+            else self.write_executor
+        worker = loop.run_in_executor(
+            executor, self.run_wsgi, build_environ(scope, body, size), loop,
+            queue, cancelled)
+
+        started = False
+        try:
+            while True:
+                item = await queue.get()
+                if item is None or cancelled.is_set():
+                    break
+                if item[0] == 'start':
+                    started = True
+                    await send({
+                        'type': 'http.response.start',
+                        'status': item[1],
+                        'headers': [(name.encode('latin-1'),
+                                     value.encode('latin-1'))
+                                    for name, value in item[2]],
+                    })
+                else:
+                    await send({'type': 'http.response.body',
+                                'body': item[1], 'more_body': True})
+
+            if started and not cancelled.is_set():
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            cancelled.set()
+            watcher.cancel()
+            while not worker.done():
+                # unblock a worker waiting for room in the queue
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0.01)
+            body.close()
+
+        # re-raise anything the application raised
+        await worker
@@ -0,0 +1,233 @@
+import json
+import math
+import re
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import close_old_connections
+from django.test import Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, \
+    encode_multipart
+from django.urls import reverse
+
+
+# data is JSON encodable, or bytes sent as is with the Content-Type
+# header. Successive requests cycle through paths when it is given, for
+# endpoints that consume their object, like DELETE.
+Endpoint = namedtuple('Endpoint', 'name method path data headers paths',
+                      defaults=(None,))
+
+# Objects made for the write and media endpoints, removed after the run
+Throwaway = namedtuple('Throwaway',
+                       'tag_id ingredient_id recipe_id image_recipe_id '
+                       'delete_ids image')
+
+THROWAWAY_PREFIX = 'Benchmark '
+
+Sample = namedtuple('Sample', 'seconds status queries')
+
+QUERIES_PATTERN = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def query_count(server_timing):
+    """:return query count reported by ServerTimingMiddleware, or None"""
+    match = QUERIES_PATTERN.search(server_timing or '')
+
+    return int(match.group(1)) if match else None
+
+
+def percentile(values, pct):
+    """:return the nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(values)) - 1, 0)
+
+    return values[min(rank, len(values) - 1)]
+
+
+def summarize(endpoint, samples, elapsed):
+    """:return the JSON report of one endpoint"""
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    queries = [sample.queries for sample in samples
+               if sample.queries is not None]
+
+    def ms(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        'endpoint': endpoint.name,
+        'method': endpoint.method,
+        'path': endpoint.path,
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample.status >= 400),
+        'rps': round(len(samples) / elapsed, 1) if elapsed else None,
+        'p50_ms': ms(percentile(latencies, 50)),
+        'p95_ms': ms(percentile(latencies, 95)),
+        'p99_ms': ms(percentile(latencies, 99)),
+        'queries_per_request':
+            round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+class HttpTransport:
+    """Send requests to a running server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def __call__(self, endpoint):
+        """:return (status, Server-Timing header) of one request"""
+        body = None
+        headers = {'Accept': 'application/json'}
+        if isinstance(endpoint.data, bytes):
+            body = endpoint.data
+        elif endpoint.data is not None:
+            body = json.dumps(endpoint.data).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        headers.update(endpoint.headers)
+
+        request = urllib.request.Request(self.base_url + endpoint.path,
+                                         data=body, headers=headers,
+                                         method=endpoint.method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, response.headers['Server-Timing']
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.headers['Server-Timing']
+
+
+class InProcessTransport:
+    """Send requests through the Django test client, without a server"""
+
+    def __call__(self, endpoint):
+        """:return (status, Server-Timing header) of one request"""
+        headers = dict(endpoint.headers)
+        content_type = headers.pop('Content-Type', 'application/json')
+        extra = {'HTTP_' + name.upper().replace('-', '_'): value
+                 for name, value in headers.items()}
+        data = endpoint.data
+        if data is not None and not isinstance(data, bytes):
+            data = json.dumps(data)
+
+        response = Client(SERVER_NAME='localhost').generic(
+            endpoint.method, endpoint.path, data,
+            content_type=content_type, **extra)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        # the test client skips this, the handler of a server does not
+        close_old_connections()
+
+        return response.status_code, response.get('Server-Timing')
+
+
+def multipart(field, name, content):
+    """:return (body, Content-Type) of a form uploading one file"""
+    upload = SimpleUploadedFile(name, content)
+
+    return encode_multipart(BOUNDARY, {field: upload}), MULTIPART_CONTENT
+
+
+def build_endpoints(email, password, token, recipe_id, throwaway=None):
+    """
+    :return the endpoints driven by the benchmark. The write and media
+    endpoints need throwaway objects, see Throwaway.
+    """
+    auth = {'Authorization': f'Token {token}'}
+
+    endpoints = [
+        Endpoint('token', 'POST', reverse('user:token'),
+                 {'email': email, 'password': password}, {}),
+        Endpoint('me', 'GET', reverse('user:me'), None, auth),
+        Endpoint('tags', 'GET', reverse('recipe:tag-list'), None, auth),
+        Endpoint('tags-assigned', 'GET',
+                 reverse('recipe:tag-list') + '?assigned_only=1', None, auth),
+        Endpoint('ingredients', 'GET', reverse('recipe:ingredients-list'),
+                 None, auth),
+        Endpoint('recipes', 'GET', reverse('recipe:recipe-list'), None, auth),
+        Endpoint('recipes-export', 'GET',
+                 reverse('recipe:recipe-export-recipes'), None, auth),
+    ]
+    if recipe_id is not None:
+        endpoints += [
+            Endpoint('recipe-detail', 'GET',
+                     reverse('recipe:recipe-detail', args=[recipe_id]),
+                     None, auth),
+            Endpoint('recipes-batch', 'POST', reverse('recipe:recipe-batch'),
+                     {'ids': [recipe_id]}, auth),
+        ]
+    if throwaway is None:
+        return endpoints
+
+    def names(kind, count):
+        return [{'name': f'{THROWAWAY_PREFIX}{kind} {n}'}
+                for n in range(count)]
+
+    recipe = {'title': f'{THROWAWAY_PREFIX}recipe', 'time_minutes': 10,
+              'price': '5.00', 'tag': [throwaway.tag_id],
+              'ingredients': [throwaway.ingredient_id]}
+    recipe_url = reverse('recipe:recipe-detail',
+                         args=[throwaway.recipe_id])
+    upload, content_type = multipart('image', 'benchmark.jpg',
+                                     throwaway.image)
+
+    return endpoints + [
+        Endpoint('tag-create', 'POST', reverse('recipe:tag-list'),
+                 names('tag', 1)[0], auth),
+        Endpoint('tags-bulk-create', 'POST', reverse('recipe:tag-list'),
+                 names('tag', 10), auth),
+        Endpoint('ingredient-create', 'POST',
+                 reverse('recipe:ingredients-list'),
+                 names('ingredient', 1)[0], auth),
+        Endpoint('ingredients-bulk-create', 'POST',
+                 reverse('recipe:ingredients-list'),
+                 names('ingredient', 10), auth),
+        Endpoint('recipe-create', 'POST', reverse('recipe:recipe-list'),
+                 recipe, auth),
+        Endpoint('recipes-bulk-create', 'POST', reverse('recipe:recipe-list'),
+                 [recipe] * 10, auth),
+        Endpoint('recipe-update', 'PUT', recipe_url, recipe, auth),
+        Endpoint('recipe-partial-update', 'PATCH', recipe_url,
+                 {'time_minutes': 20}, auth),
+        Endpoint('recipe-image', 'GET',
+                 reverse('recipe:recipe-image',
+                         args=[throwaway.image_recipe_id]), None, auth),
+        Endpoint('recipe-thumbnail', 'GET',
+                 reverse('recipe:recipe-thumbnail',
+                         args=[throwaway.image_recipe_id]), None, auth),
+        Endpoint('recipe-upload-image', 'POST',
+                 reverse('recipe:recipe-upload-image',
+                         args=[throwaway.recipe_id]),
+                 upload, dict(auth, **{'Content-Type': content_type})),
+        Endpoint('recipe-delete', 'DELETE',
+                 reverse('recipe:recipe-detail',
+                         args=[throwaway.delete_ids[0]]), None, auth,
+                 paths=[reverse('recipe:recipe-detail', args=[pk])
+                        for pk in throwaway.delete_ids]),
+    ]
+
+
+def run_endpoint(transport, endpoint, concurrency, requests):
+    """
+    Send `requests` requests to endpoint from `concurrency` threads
+    :return: the endpoint report
+    """
+    def timed_request(index):
+        sent = endpoint
+        if endpoint.paths:
+            sent = endpoint._replace(
+                path=endpoint.paths[index % len(endpoint.paths)])
+        start = time.perf_counter()
+        status, server_timing = transport(sent)
+        return Sample(time.perf_counter() - start, status,
+                      query_count(server_timing))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed_request, range(requests)))
+
+    return summarize(endpoint, samples, time.perf_counter() - start)
@@ -0,0 +1,73 @@
+from django.db.backends.postgresql import base, creation
+
+from core.db_pool import pool
+
+
+DEFAULT_POOL = {
+    'SIZE': 5,
+    'OVERFLOW': 10,
+    'TIMEOUT': 30,
+    'IDLE_TIMEOUT': 300,
+    'PRE_PING': True,
+}
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Close pooled connections before test databases are copied or
+    dropped, as PostgreSQL refuses while sessions are open"""
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        pool.dispose_all()
+        super()._clone_test_db(suffix, verbosity, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        pool.dispose_all()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that checks connections out of a process wide
+    pool instead of connecting on every request. Pool settings come
+    from the POOL key of the database settings.
+    """
+
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        """:return the pool for these connection parameters"""
+        config = {**DEFAULT_POOL, **self.settings_dict.get('POOL', {})}
+        isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level')
+
+        def connect():
+            connection = base.Database.connect(**conn_params)
+            if isolation_level is not None and \
+                    isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=isolation_level)
+            return connection
+
+        def factory():
+            return pool.ConnectionPool(
+                connect, size=config['SIZE'], overflow=config['OVERFLOW'],
+                timeout=config['TIMEOUT'],
+                idle_timeout=config['IDLE_TIMEOUT'],
+                pre_ping=config['PRE_PING'])
+
+        key = tuple(sorted((name, str(value))
+                           for name, value in conn_params.items()))
+        return pool.get_pool(key, factory)
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        connection = self.pool.acquire()
+
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get('isolation_level',
+                                           connection.isolation_level)
+
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool.release(self.connection)
@@ -0,0 +1,286 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection became free within the checkout timeout"""
+
+
+def ping(conn):
+    """:return True if the connection answers a trivial query"""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not conn.autocommit:
+            conn.rollback()
+    except psycopg2.Error:
+        return False
+
+    return True
+
+
+def reset(conn):
+    """
+    Roll back whatever the last user left open.
+    :return False if the connection is closed or broken
+    """
+    if conn.closed:
+        return False
+
+    status = conn.get_transaction_status()
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+
+    return True
+
+
+def close_quietly(conns):
+    """Close connections, ignoring the ones already gone"""
+    for conn in conns:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of psycopg2 connections.
+
+    Up to `size` connections are kept open between requests and up to
+    `overflow` more are opened under load and closed when returned.
+    Checkouts wait at most `timeout` seconds for a free connection.
+    Idle connections are closed after `idle_timeout` seconds, and with
+    `pre_ping` every reused connection is tested first. A connection
+    found broken retires all connections opened before it, as after a
+    failover every one of them points at the old server.
+    """
+
+    def __init__(self, connect, size=5, overflow=10, timeout=30.0,
+                 idle_timeout=300.0, pre_ping=True):
+        self.connect = connect
+        self.size = size
+        self.overflow = overflow
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._generations = {}
+        self._generation = 0
+        self._pid = os.getpid()
+        self._orphans = []
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self.created = 0
+        self.recycled = 0
+        self.timeouts = 0
+
+    def _after_fork(self):
+        """
+        Forget connections inherited from the parent process. They are
+        kept referenced, since closing them would end the parent's
+        sessions on the shared sockets.
+        """
+        self._orphans.extend(conn for conn, _ in self._idle)
+        self._idle.clear()
+        self._generations.clear()
+        self._pid = os.getpid()
+        self._open = self._in_use = self._waiting = 0
+
+    def _retire(self, conn):
+        """Forget a connection the caller is about to close"""
+        self._generations.pop(conn, None)
+        self._open -= 1
+        self.recycled += 1
+
+    def _take_idle(self, stale):
+        """
+        :return the most recently used idle connection, or None. Expired
+        or retired ones are moved to `stale` for closing.
+        """
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            self._retire(conn)
+            stale.append(conn)
+
+        while self._idle:
+            conn, _ = self._idle.pop()
+            if self._generations.get(conn) == self._generation:
+                return conn
+            self._retire(conn)
+            stale.append(conn)
+
+        return None
+
+    def _checkout(self):
+        """
+        Reserve a connection slot.
+        :return (idle connection or None to open a new one, stale
+        connections to close)
+        """
+        deadline = time.monotonic() + self.timeout
+        stale = []
+
+        with self._cond:
+            if os.getpid() != self._pid:
+                self._after_fork()
+
+            while True:
+                conn = self._take_idle(stale)
+                if conn is not None or self._open < self.size + self.overflow:
+                    if conn is None:
+                        self._open += 1
+                    self._in_use += 1
+                    return conn, stale
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    close_quietly(stale)
+                    raise PoolTimeout(
+                        f'No database connection free after '
+                        f'{self.timeout}s ({self._in_use} in use)')
+
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _open_connection(self):
+        """Open a new connection in a slot reserved by _checkout"""
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._generations[conn] = self._generation
+            self.created += 1
+
+        return conn
+
+    def acquire(self):
+        """:return a working connection, opening one if needed"""
+        while True:
+            conn, stale = self._checkout()
+            close_quietly(stale)
+
+            if conn is None:
+                return self._open_connection()
+
+            if not self.pre_ping or ping(conn):
+                return conn
+
+            logger.warning('Database connection failed its health check, '
+                           'retiring all pooled connections')
+            with self._cond:
+                self._generation += 1
+                self._in_use -= 1
+                self._retire(conn)
+                self._cond.notify()
+            close_quietly([conn])
+
+    def release(self, conn):
+        """Return a connection, closing it if broken, retired or spare"""
+        usable = reset(conn)
+
+        with self._cond:
+            if os.getpid() != self._pid:
+                self._after_fork()
+                self._orphans.append(conn)
+                return
+
+            self._in_use -= 1
+            if not usable:
+                # a dropped connection means the server went away
+                self._generation += 1
+
+            keep = (usable and
+                    self._generations.get(conn) == self._generation and
+                    self._open <= self.size)
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._retire(conn)
+            self._cond.notify()
+
+        if not keep:
+            close_quietly([conn])
+
+    def dispose(self):
+        """Close idle connections and retire the ones in use"""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            for conn in idle:
+                self._generations.pop(conn, None)
+            self._open -= len(idle)
+            self._generation += 1
+            self._cond.notify_all()
+
+        close_quietly(idle)
+
+    def stats(self):
+        """:return a snapshot of the pool usage counters"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'overflow': self.overflow,
+                'open': self._open,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'created': self.created,
+                'recycled': self.recycled,
+                'timeouts': self.timeouts,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    """:return the pool registered under key, creating it with factory"""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+
+    return pool
+
+
+def all_pools():
+    """:return {key: pool} of every pool in this process"""
+    with _pools_lock:
+        return dict(_pools)
+
+
+def dispose_all():
+    """Dispose of every pool in this process"""
+    for pool in all_pools().values():
+        pool.dispose()
@@ -0,0 +1,87 @@
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_state = threading.local()
+
+
+def pin_key(user_id):
+    """:return cache key marking a user's reads as pinned to the primary"""
+    return f'db:pinned:{user_id}'
+
+
+def pin(user):
+    """Send the user's reads to the primary for REPLICA_PIN_SECONDS"""
+    cache.set(pin_key(user.pk), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def pinned(user):
+    """:return True if the user wrote recently"""
+    return cache.get(pin_key(user.pk)) is not None
+
+
+def reset_writes():
+    """Forget writes routed so far in this thread"""
+    _state.wrote = False
+
+
+def wrote():
+    """:return True if a write was routed since reset_writes"""
+    return getattr(_state, 'wrote', False)
+
+
+def reading_replica():
+    """:return True if reads in this thread are routed to a replica"""
+    return getattr(_state, 'replica', None) is not None and not wrote()
+
+
+@contextmanager
+def replica_reads(user):
+    """
+    Route reads inside the block to a random replica, unless there are
+    none or the user is pinned to the primary
+    """
+    previous = getattr(_state, 'replica', None)
+    replicas = settings.DATABASE_REPLICAS
+    if replicas and not pinned(user):
+        _state.replica = random.choice(replicas)
+    try:
+        yield
+    finally:
+        _state.replica = previous
+
+
+def read_from_replica(method):
+    """Run a viewset action with replica_reads for the request user"""
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        with replica_reads(request.user):
+            return method(self, request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica chosen by replica_reads and everything else
+    to the primary. A write inside the block sends the remaining reads of
+    the request to the primary too, so they see it.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not reading_replica():
+            return 'default'
+
+        return _state.replica
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
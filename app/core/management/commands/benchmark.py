@@ -0,0 +1,140 @@
+import io
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from core import benchmark
+from core.db_pool import pool
+from core.models import Recipe, Tag, Ingredients
+from core.management.commands.seed_data import SEED_PASSWORD, seed_email
+from recipe import images
+
+
+class Command(BaseCommand):
+    """
+    Django command to load test the API endpoints with a user created
+    by seed_data and report latency, throughput and queries as JSON
+    """
+
+    help = 'Benchmark the API endpoints and print a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url',
+                            help='server to benchmark, e.g. '
+                                 'http://localhost:8000; requests are '
+                                 'sent in-process when omitted')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='requests per endpoint')
+        parser.add_argument('--prefix', default='bench',
+                            help='email prefix used with seed_data')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='only run the named endpoint(s)')
+        parser.add_argument('--output', help='also write the report here')
+
+    def handle(self, *args, **options):
+        """
+        This method handle the command
+        :param args:
+        :param options:
+        :return: None
+        """
+        email = seed_email(options['prefix'], 0)
+        user = get_user_model().objects.filter(email=email).first()
+        if user is None:
+            raise CommandError(f'No user {email}, run seed_data first')
+
+        token, _ = Token.objects.get_or_create(user=user)
+        recipe_id = Recipe.objects.filter(user=user).\
+            values_list('id', flat=True).first()
+
+        try:
+            endpoints = benchmark.build_endpoints(
+                email, SEED_PASSWORD, token.key, recipe_id,
+                self.create_throwaway(user, options['requests']))
+            if options['endpoints']:
+                endpoints = [endpoint for endpoint in endpoints
+                             if endpoint.name in options['endpoints']]
+
+            self.run(endpoints, options)
+        finally:
+            self.remove_throwaway(user)
+
+    def create_throwaway(self, user, requests):
+        """
+        :return Throwaway objects for the write and media endpoints: a
+        tag, an ingredient, a recipe to update and upload to, a recipe
+        with an image and thumbnail, and one recipe per DELETE
+        """
+        prefix = benchmark.THROWAWAY_PREFIX
+        tag = Tag.objects.create(user=user, name=f'{prefix}tag')
+        ingredient = Ingredients.objects.create(user=user,
+                                                name=f'{prefix}ingredient')
+        recipes = Recipe.objects.bulk_create(
+            Recipe(user=user, title=f'{prefix}recipe', time_minutes=10,
+                   price=5) for _ in range(requests + 2))
+        if not recipes[0].pk:
+            recipes = list(Recipe.objects.filter(
+                user=user, title=f'{prefix}recipe').order_by('id'))
+
+        image = Image.new('RGB', (1200, 900), (200, 120, 40))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG')
+        with_image = recipes[1]
+        with_image.image.save('benchmark.jpg', ContentFile(buffer.getvalue()))
+        images.process_recipe_image(with_image.pk, with_image.image.name)
+
+        return benchmark.Throwaway(
+            tag_id=tag.pk, ingredient_id=ingredient.pk,
+            recipe_id=recipes[0].pk, image_recipe_id=with_image.pk,
+            delete_ids=[recipe.pk for recipe in recipes[2:]],
+            image=buffer.getvalue())
+
+    def remove_throwaway(self, user):
+        """Delete the throwaway objects, those the run created and files"""
+        prefix = benchmark.THROWAWAY_PREFIX
+        recipes = Recipe.objects.filter(user=user, title__startswith=prefix)
+        for recipe in recipes.exclude(image='').exclude(image=None):
+            recipe.image.delete(save=False)
+            recipe.thumbnail.delete(save=False)
+
+        recipes.delete()
+        Tag.objects.filter(user=user, name__startswith=prefix).delete()
+        Ingredients.objects.filter(user=user,
+                                   name__startswith=prefix).delete()
+
+    def run(self, endpoints, options):
+        """Run the endpoints and write the JSON report"""
+        if options['base_url']:
+            transport = benchmark.HttpTransport(options['base_url'])
+        else:
+            transport = benchmark.InProcessTransport()
+
+        report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'target': options['base_url'] or 'in-process',
+            'concurrency': options['concurrency'],
+            'requests_per_endpoint': options['requests'],
+            'endpoints': [
+                benchmark.run_endpoint(transport, endpoint,
+                                       options['concurrency'],
+                                       options['requests'])
+                for endpoint in endpoints
+            ],
+        }
+        if not options['base_url']:
+            # a server reports its own pools at /api/health/db-pool/
+            report['db_pools'] = [db_pool.stats()
+                                  for db_pool in pool.all_pools().values()]
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fp:
+                fp.write(output)
+
+        self.stdout.write(output)
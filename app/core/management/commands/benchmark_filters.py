@@ -0,0 +1,125 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmark
+from core.models import Recipe, Tag, Ingredients
+from core.management.commands.seed_data import seed_email
+from recipe import filters
+
+
+def joined_any(queryset, tag_ids, ingredient_ids):
+    """:return the former filter, joining both M2M tables with IN"""
+    return queryset.filter(tag__id__in=tag_ids).\
+        filter(ingredients__id__in=ingredient_ids)
+
+
+def joined_all(queryset, tag_ids, ingredient_ids):
+    """:return match-all written as one join per requested id"""
+    for tag_id in tag_ids:
+        queryset = queryset.filter(tag__id=tag_id)
+    for ingredient_id in ingredient_ids:
+        queryset = queryset.filter(ingredients__id=ingredient_id)
+
+    return queryset
+
+
+def subquery(mode):
+    """:return a filter using recipe.filters in `mode`"""
+    def apply(queryset, tag_ids, ingredient_ids):
+        queryset = filters.filter_related(queryset, 'tag', tag_ids, mode)
+        return filters.filter_related(queryset, 'ingredients',
+                                      ingredient_ids, mode)
+
+    return apply
+
+
+CASES = {
+    'any': (joined_any, subquery('any')),
+    'all': (joined_all, subquery('all')),
+}
+
+
+def timed(queryset, repeat):
+    """:return (sorted durations in ms, ids) of repeated fetches"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ids = list(queryset.order_by('-id').values_list('id', flat=True))
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return sorted(durations), ids
+
+
+def report(durations, ids):
+    """:return latency and row summary of one filter"""
+    return {
+        "rows": len(ids),
+        "distinct": len(set(ids)),
+        "p50_ms": round(benchmark.percentile(durations, 50), 3),
+        "p95_ms": round(benchmark.percentile(durations, 95), 3),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Django command to compare the joined and subquery tag and ingredient
+    filters on a user created by seed_data. Seed with a high
+    --tags-per-recipe to see the joins multiply rows.
+    """
+
+    help = 'Benchmark recipe tag and ingredient filters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='bench',
+                            help='email prefix used with seed_data')
+        parser.add_argument('--tags', type=int, default=4,
+                            help='tag ids to filter by')
+        parser.add_argument('--ingredients', type=int, default=2,
+                            help='ingredient ids to filter by')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        """
+        This method handle the command
+        :param args:
+        :param options:
+        :return: None
+        """
+        email = seed_email(options['prefix'], 0)
+        user = get_user_model().objects.filter(email=email).first()
+        if user is None:
+            raise CommandError(f'No user {email}, run seed_data first')
+
+        tag_ids = list(Tag.objects.filter(user=user).order_by('id').
+                       values_list('id', flat=True)[:options['tags']])
+        ingredient_ids = list(
+            Ingredients.objects.filter(user=user).order_by('id').
+            values_list('id', flat=True)[:options['ingredients']])
+        queryset = Recipe.objects.filter(user=user)
+        recipes = queryset.count()
+
+        results = {}
+        for name, (joined, subqueried) in CASES.items():
+            joined_ms, joined_ids = timed(
+                joined(queryset, tag_ids, ingredient_ids),
+                options['repeat'])
+            subquery_ms, subquery_ids = timed(
+                subqueried(queryset, tag_ids, ingredient_ids),
+                options['repeat'])
+            results[name] = {
+                "joined": report(joined_ms, joined_ids),
+                "subquery": report(subquery_ms, subquery_ids),
+                "same_recipes": set(joined_ids) == set(subquery_ids),
+            }
+
+        self.stdout.write(json.dumps({
+            "recipes": recipes,
+            "tags_per_recipe": round(Recipe.tag.through.objects.filter(
+                recipe__user=user).count() / max(recipes, 1), 1),
+            "tag_ids": len(tag_ids),
+            "ingredient_ids": len(ingredient_ids),
+            "modes": results,
+        }, indent=2))
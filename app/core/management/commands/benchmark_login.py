@@ -0,0 +1,144 @@
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core import benchmark
+from core.management.commands.seed_data import SEED_PASSWORD, seed_email
+from user import throttling
+
+
+def attempts(options):
+    """
+    :return shuffled (kind, email, password, ip) login attempts. Valid
+    logins come from one address per account, invalid ones from the
+    attacker addresses against a separate set of accounts.
+    """
+    rng = random.Random(options['seed'])
+    accounts = options['accounts']
+    invalid = round(options['requests'] * options['invalid_ratio'])
+
+    logins = [('valid', seed_email(options['prefix'], n % accounts),
+               SEED_PASSWORD, f'10.1.0.{n % accounts + 1}')
+              for n in range(options['requests'] - invalid)]
+    logins += [('invalid',
+                seed_email(options['prefix'], accounts + n % accounts),
+                'wrong-password',
+                f'10.2.0.{n % options["attacker_ips"] + 1}')
+               for n in range(invalid)]
+    rng.shuffle(logins)
+
+    return logins
+
+
+def run(logins, concurrency):
+    """:return (elapsed seconds, [(kind, status, seconds)]) of the logins"""
+    url = reverse('user:token')
+
+    def login(attempt):
+        kind, email, password, ip = attempt
+        start = time.perf_counter()
+        response = Client(SERVER_NAME='localhost').post(
+            url, {'email': email, 'password': password}, REMOTE_ADDR=ip)
+        # the test client skips this, the handler of a server does not
+        close_old_connections()
+        return kind, response.status_code, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, logins))
+
+    return time.perf_counter() - start, results
+
+
+def report(elapsed, results):
+    """:return throughput, latency and status summary of one run"""
+    summary = {'rps': round(len(results) / elapsed, 1)}
+    for kind in ('valid', 'invalid'):
+        latencies = sorted(seconds * 1000 for k, _, seconds in results
+                           if k == kind)
+        statuses = Counter(str(status) for k, status, _ in results
+                           if k == kind)
+        summary[kind] = {
+            'requests': len(latencies),
+            'statuses': dict(sorted(statuses.items())),
+            'p50_ms': round(benchmark.percentile(latencies, 50) or 0, 2),
+            'p95_ms': round(benchmark.percentile(latencies, 95) or 0, 2),
+        }
+
+    return summary
+
+
+class Command(BaseCommand):
+    """
+    Django command to measure /api/user/token/ throughput under a mix of
+    valid and invalid credentials, with and without the failed login
+    limits, using users created by seed_data
+    """
+
+    help = 'Benchmark the token endpoint under a credential stuffing mix'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='bench',
+                            help='email prefix used with seed_data')
+        parser.add_argument('--accounts', type=int, default=5,
+                            help='accounts logging in; as many others '
+                                 'are attacked')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--invalid-ratio', type=float, default=0.5)
+        parser.add_argument('--attacker-ips', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def reset_limits(self, logins):
+        """Forget failures recorded for the benchmark accounts and ips"""
+        for _, email, _, ip in logins:
+            throttling.reset(email, ip)
+
+    def handle(self, *args, **options):
+        """
+        This method handle the command
+        :param args:
+        :param options:
+        :return: None
+        """
+        emails = [seed_email(options['prefix'], n)
+                  for n in range(2 * options['accounts'])]
+        found = get_user_model().objects.filter(email__in=emails).count()
+        if found < len(emails):
+            raise CommandError(f'Found {found} of {len(emails)} users, '
+                               f'run seed_data with more --users')
+
+        logins = attempts(options)
+        runs = {}
+
+        self.reset_limits(logins)
+        with override_settings(LOGIN_FAILURE_ACCOUNT_LIMIT=0,
+                               LOGIN_FAILURE_IP_LIMIT=0):
+            runs['unlimited'] = report(*run(logins,
+                                            options['concurrency']))
+
+        self.reset_limits(logins)
+        runs['limited'] = report(*run(logins, options['concurrency']))
+        self.reset_limits(logins)
+
+        self.stdout.write(json.dumps({
+            'requests': len(logins),
+            'invalid_ratio': options['invalid_ratio'],
+            'concurrency': options['concurrency'],
+            'pbkdf2_iterations': settings.PASSWORD_PBKDF2_ITERATIONS,
+            'limits': {
+                'account': settings.LOGIN_FAILURE_ACCOUNT_LIMIT,
+                'ip': settings.LOGIN_FAILURE_IP_LIMIT,
+                'window_seconds': settings.LOGIN_FAILURE_WINDOW,
+            },
+            'runs': runs,
+        }, indent=2))
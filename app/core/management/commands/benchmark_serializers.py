@@ -0,0 +1,130 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from core import benchmark
+from core.models import Recipe, Tag, Ingredients
+from core.management.commands.seed_data import seed_email
+from recipe import rows
+from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
+
+
+def ordered(queryset):
+    """:return queryset prefetching related objects ordered by id"""
+    return queryset.prefetch_related(
+        Prefetch("tag", queryset=Tag.objects.order_by("id")),
+        Prefetch("ingredients", queryset=Ingredients.objects.order_by("id")))
+
+
+def serializer_list(queryset, request):
+    """:return a page rendered through RecipeSerializer"""
+    return RecipeSerializer(ordered(queryset), many=True,
+                            context={"request": request}).data
+
+
+def rows_list(queryset, request):
+    """:return a page rendered from values() rows"""
+    return rows.render(list(rows.values(queryset, rows.LIST_FIELDS)),
+                       request)
+
+
+def serializer_detail(queryset, request):
+    """:return the first recipe rendered through RecipeDetailSerializer"""
+    return RecipeDetailSerializer(ordered(queryset).first(),
+                                  context={"request": request}).data
+
+
+def rows_detail(queryset, request):
+    """:return the first recipe rendered from its values() row"""
+    row = rows.values(queryset, rows.DETAIL_FIELDS).first()
+
+    return rows.render([row], request, detail=True)[0]
+
+
+PATHS = {
+    "list": (serializer_list, rows_list),
+    "detail": (serializer_detail, rows_detail),
+}
+
+
+def timed(build, queryset, request, repeat):
+    """:return (sorted durations in ms, JSON bytes) of repeated builds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = JSONRenderer().render(build(queryset, request))
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return sorted(durations), content
+
+
+def report(durations):
+    """:return latency summary of one path"""
+    return {
+        "p50_ms": round(benchmark.percentile(durations, 50), 3),
+        "p95_ms": round(benchmark.percentile(durations, 95), 3),
+        "mean_ms": round(sum(durations) / len(durations), 3),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Django command to compare the ModelSerializer and values() rendering
+    of recipe pages and details for a user created by seed_data
+    """
+
+    help = 'Benchmark recipe serializers against values() rendering'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='bench',
+                            help='email prefix used with seed_data')
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--output', help='also write the report here')
+
+    def handle(self, *args, **options):
+        """
+        This method handle the command
+        :param args:
+        :param options:
+        :return: None
+        """
+        email = seed_email(options['prefix'], 0)
+        user = get_user_model().objects.filter(email=email).first()
+        if user is None:
+            raise CommandError(f'No user {email}, run seed_data first')
+
+        request = APIRequestFactory().get('/', SERVER_NAME='localhost')
+        queryset = Recipe.objects.filter(user=user).\
+            order_by('-id')[:options['page_size']]
+
+        results = {}
+        for name, (serializer_path, rows_path) in PATHS.items():
+            serializer_ms, expected = timed(serializer_path, queryset,
+                                            request, options['repeat'])
+            rows_ms, content = timed(rows_path, queryset, request,
+                                     options['repeat'])
+            results[name] = {
+                "serializer": report(serializer_ms),
+                "rows": report(rows_ms),
+                "speedup": round(
+                    benchmark.percentile(serializer_ms, 50) /
+                    benchmark.percentile(rows_ms, 50), 2),
+                "identical": content == expected,
+            }
+
+        output = json.dumps({
+            "page_size": options['page_size'],
+            "repeat": options['repeat'],
+            "paths": results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fp:
+                fp.write(output)
+
+        self.stdout.write(output)
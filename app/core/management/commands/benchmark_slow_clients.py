@@ -0,0 +1,199 @@
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core import benchmark
+from core.asgi import AsgiHandler, build_environ
+from core.management.commands.seed_data import SEED_PASSWORD, seed_email
+
+
+class SlowInput:
+    """Request body that arrives in `chunks` pieces, `delay` apart"""
+
+    def __init__(self, body, chunks, delay):
+        size = math.ceil(len(body) / chunks)
+        self.pieces = [body[i:i + size] for i in range(0, len(body), size)]
+        self.delay = delay
+
+    def read(self, size=-1):
+        data = b''
+        while self.pieces and (size < 0 or len(data) < size):
+            time.sleep(self.delay)
+            data += self.pieces.pop(0)
+
+        return data
+
+
+def http_scope(method, path, headers, body=b''):
+    """:return an ASGI http scope for a request to this process"""
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+               for name, value in headers.items()]
+    if body:
+        headers.append((b'content-length', str(len(body)).encode()))
+
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')] + headers,
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+
+
+def latency_report(latencies):
+    """:return latency percentiles in ms"""
+    latencies = sorted(seconds * 1000 for seconds in latencies)
+
+    return {
+        'p50_ms': round(benchmark.percentile(latencies, 50), 1),
+        'p95_ms': round(benchmark.percentile(latencies, 95), 1),
+        'max_ms': round(latencies[-1], 1),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Django command to compare how fast requests fare next to slow
+    uploads when served by a pool of WSGI worker threads and by the
+    ASGI handler with the same number of threads
+    """
+
+    help = 'Benchmark WSGI and ASGI serving under slow-client load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='worker threads of either deployment')
+        parser.add_argument('--slow-clients', type=int, default=8)
+        parser.add_argument('--slow-seconds', type=float, default=2,
+                            help='time each slow client takes to upload')
+        parser.add_argument('--chunks', type=int, default=10,
+                            help='pieces each slow upload arrives in')
+        parser.add_argument('--fast-requests', type=int, default=40)
+        parser.add_argument('--prefix', default='bench',
+                            help='email prefix used with seed_data')
+
+    def requests(self, options):
+        """:return (slow request, fast request) as (method, path,
+        headers, body)"""
+        email = seed_email(options['prefix'], 0)
+        user = get_user_model().objects.filter(email=email).first()
+        if user is None:
+            raise CommandError(f'No user {email}, run seed_data first')
+        token, _ = Token.objects.get_or_create(user=user)
+
+        body = json.dumps({'email': email, 'password': SEED_PASSWORD,
+                           'padding': 'x' * 4096}).encode('utf-8')
+        slow = ('POST', reverse('user:token'),
+                {'Content-Type': 'application/json'}, body)
+        fast = ('GET', reverse('recipe:recipe-list'),
+                {'Authorization': f'Token {token.key}'}, b'')
+
+        return slow, fast
+
+    def run_wsgi(self, handler, slow, fast, options):
+        """:return fast request latencies with WSGI worker threads"""
+        delay = options['slow_seconds'] / options['chunks']
+
+        def serve(request, slow_body, start):
+            method, path, headers, body = request
+            stream = SlowInput(body, options['chunks'], delay) \
+                if slow_body else None
+            environ = build_environ(http_scope(method, path, headers, body),
+                                    stream, len(body))
+            result = handler(environ, lambda status, headers: None)
+            b''.join(result)
+            result.close()
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(options['workers']) as pool:
+            # latency counts from submission, including the wait for a
+            # worker a slow client holds
+            for _ in range(options['slow_clients']):
+                pool.submit(serve, slow, True, time.perf_counter())
+            fast_jobs = [pool.submit(serve, fast, False, time.perf_counter())
+                         for _ in range(options['fast_requests'])]
+            return [job.result() for job in fast_jobs]
+
+    async def run_asgi(self, handler, slow, fast, options):
+        """:return fast request latencies with the ASGI handler"""
+        delay = options['slow_seconds'] / options['chunks']
+
+        async def serve(request, slow_body):
+            method, path, headers, body = request
+            start = time.perf_counter()
+            pieces = SlowInput(body, options['chunks'], 0).pieces \
+                if slow_body else [body]
+
+            finished = asyncio.Event()
+
+            async def receive():
+                if not pieces:
+                    # like a server, report the disconnect once the
+                    # response is complete
+                    await finished.wait()
+                    return {'type': 'http.disconnect'}
+                if slow_body:
+                    await asyncio.sleep(delay)
+                piece = pieces.pop(0)
+                return {'type': 'http.request', 'body': piece,
+                        'more_body': bool(pieces)}
+
+            async def send(message):
+                if message['type'] == 'http.response.body' and \
+                        not message.get('more_body', False):
+                    finished.set()
+
+            await handler(http_scope(method, path, headers, body),
+                          receive, send)
+            return time.perf_counter() - start
+
+        slow_tasks = [asyncio.ensure_future(serve(slow, True))
+                      for _ in range(options['slow_clients'])]
+        latencies = await asyncio.gather(
+            *[serve(fast, False) for _ in range(options['fast_requests'])])
+        await asyncio.gather(*slow_tasks)
+
+        return latencies
+
+    def handle(self, *args, **options):
+        """
+        This method handle the command
+        :param args:
+        :param options:
+        :return: None
+        """
+        slow, fast = self.requests(options)
+        wsgi_handler = WSGIHandler()
+        workers = options['workers']
+
+        wsgi_latencies = self.run_wsgi(wsgi_handler, slow, fast, options)
+
+        asgi_handler = AsgiHandler(wsgi_handler,
+                                   read_threads=max(workers - workers // 2, 1),
+                                   write_threads=max(workers // 2, 1))
+        asgi_latencies = asyncio.get_event_loop().run_until_complete(
+            self.run_asgi(asgi_handler, slow, fast, options))
+
+        self.stdout.write(json.dumps({
+            'workers': workers,
+            'slow_clients': options['slow_clients'],
+            'slow_seconds': options['slow_seconds'],
+            'fast_requests': options['fast_requests'],
+            'fast_latency': {
+                'wsgi': latency_report(wsgi_latencies),
+                'asgi': latency_report(asgi_latencies),
+            },
+        }, indent=2))
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipe import images
+
+
+class Command(BaseCommand):
+    """
+    Django command to process recipe images left pending by a restart,
+    marking the ones that cannot be processed as failed
+    """
+
+    help = 'Process recipe images stuck in the pending state'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int,
+                            default=settings.RECIPE_IMAGE_STALE_SECONDS,
+                            help='seconds an upload must have been '
+                                 'pending for, 0 at startup when no '
+                                 'job can still be running')
+
+    def handle(self, *args, **options):
+        """
+        This method handle the command
+        :param args:
+        :param options:
+        :return: None
+        """
+        stale = list(images.stale_pending(options['older_than']))
+
+        for recipe_id, image_name in stale:
+            images.run_job(recipe_id, image_name)
+
+        self.stdout.write(f'Processed {len(stale)} pending images')
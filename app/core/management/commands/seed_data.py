@@ -0,0 +1,121 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from core.models import Tag, Ingredients, Recipe
+
+
+SEED_PASSWORD = 'benchmark-password'
+
+
+def seed_email(prefix, index):
+    """:return email of a synthetic user"""
+    return f'{prefix}-{index}@example.com'
+
+
+class Command(BaseCommand):
+    """
+    Django command to seed synthetic users, recipes, tags and
+    ingredients for load testing
+    """
+
+    help = 'Seed synthetic benchmark data with bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--recipes', type=int, default=100,
+                            help='recipes per user')
+        parser.add_argument('--tags', type=int, default=20,
+                            help='tags per user')
+        parser.add_argument('--ingredients', type=int, default=50,
+                            help='ingredients per user')
+        parser.add_argument('--tags-per-recipe', type=int, default=3)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--prefix', default='bench',
+                            help='email prefix of the seeded users')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """
+        This method handle the command
+        :param args:
+        :param options:
+        :return: None
+        """
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        prefix = options['prefix']
+
+        with transaction.atomic():
+            users = self.create_users(prefix, options['users'], batch_size)
+
+            for user in users:
+                self.seed_user(user, rng, options)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users with prefix "{prefix}", '
+            f'password "{SEED_PASSWORD}"'))
+
+    def create_users(self, prefix, count, batch_size):
+        """Create users and tokens, hashing the shared password once"""
+        password = make_password(SEED_PASSWORD)
+        model = get_user_model()
+        emails = [seed_email(prefix, index) for index in range(count)]
+
+        model.objects.bulk_create(
+            [model(email=email, name=email, password=password)
+             for email in emails],
+            batch_size=batch_size)
+        users = list(model.objects.filter(email__in=emails).order_by('id'))
+
+        tokens = [Token(user=user) for user in users]
+        for token in tokens:
+            token.key = token.generate_key()
+        Token.objects.bulk_create(tokens, batch_size=batch_size)
+
+        return users
+
+    def bulk_create_for(self, model, user, objs, batch_size):
+        """:return ids of the rows created for user, in insert order"""
+        model.objects.bulk_create(objs, batch_size=batch_size)
+
+        return list(model.objects.filter(user=user).
+                    order_by('id').values_list('id', flat=True))
+
+    def seed_user(self, user, rng, options):
+        """Create a user's tags, ingredients, recipes and their links"""
+        batch_size = options['batch_size']
+
+        tag_ids = self.bulk_create_for(Tag, user, [
+            Tag(user=user, name=f'Tag {n}')
+            for n in range(options['tags'])], batch_size)
+        ingredient_ids = self.bulk_create_for(Ingredients, user, [
+            Ingredients(user=user, name=f'Ingredient {n}')
+            for n in range(options['ingredients'])], batch_size)
+        recipe_ids = self.bulk_create_for(Recipe, user, [
+            Recipe(user=user, title=f'Recipe {n}',
+                   time_minutes=rng.randint(5, 120),
+                   price=rng.randint(100, 9999) / 100)
+            for n in range(options['recipes'])], batch_size)
+
+        tags_per_recipe = min(options['tags_per_recipe'], len(tag_ids))
+        ingredients_per_recipe = min(options['ingredients_per_recipe'],
+                                     len(ingredient_ids))
+
+        Recipe.tag.through.objects.bulk_create([
+            Recipe.tag.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in rng.sample(tag_ids, tags_per_recipe)
+        ], batch_size=batch_size)
+        Recipe.ingredients.through.objects.bulk_create([
+            Recipe.ingredients.through(recipe_id=recipe_id,
+                                       ingredients_id=ingredient_id)
+            for recipe_id in recipe_ids
+            for ingredient_id in rng.sample(ingredient_ids,
+                                            ingredients_per_recipe)
+        ], batch_size=batch_size)
@@ -1,8 +1,9 @@
+import random
 import time
 
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
 
 
 class Command(BaseCommand):
@@ -10,6 +11,26 @@ class Command(BaseCommand):
     Django command to pause the execution till th database is available
     """
 
+    help = 'Wait until the database accepts queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--timeout', type=float, default=60,
+                            help='give up after this many seconds')
+        parser.add_argument('--initial-delay', type=float, default=0.1,
+                            help='first retry delay in seconds')
+        parser.add_argument('--max-delay', type=float, default=5,
+                            help='upper bound of a retry delay in seconds')
+
+    def probe(self, alias):
+        """Open a connection and run a trivial query on it"""
+        db_conn = connections[alias]
+        try:
+            with db_conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        finally:
+            db_conn.close()
+
     def handle(self, *args, **options):
         """
         This method handle the command
@@ -17,16 +38,29 @@ class Command(BaseCommand):
         :param options:
         :return: None
         """
-        self.stdout.write('writing for database...')
+        self.stdout.write('waiting for database...')
 
-        db_conn = None
-
-        while not db_conn:
+        deadline = time.monotonic() + options['timeout']
+        attempt = 0
 
+        while True:
             try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write('Database unavailable, waiting for 1 sec...')
-                time.sleep(1)
+                self.probe(options['database'])
+                break
+            except OperationalError as exc:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f'Database unavailable after {attempt + 1} '
+                        f'attempts: {exc}')
+
+                # exponential backoff with full jitter
+                delay = min(options['max_delay'],
+                            options['initial_delay'] * 2 ** attempt)
+                delay = min(random.uniform(0, delay), remaining)
+                self.stdout.write(
+                    f'Database unavailable, waiting for {delay:.2f} sec...')
+                time.sleep(delay)
+                attempt += 1
 
         self.stdout.write(self.style.SUCCESS("Database available !!!"))
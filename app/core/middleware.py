@@ -0,0 +1,141 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.http import JsonResponse
+
+from core import db_router, timing
+
+
+logger = logging.getLogger(__name__)
+
+
+def view_and_action(request):
+    """:return (view name, viewset action) of the resolved request"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None, None
+
+    actions = getattr(match.func, 'actions', None) or {}
+
+    return match.view_name, actions.get(request.method.lower())
+
+
+LIVE_PATH = '/api/health/live/'
+
+READY_PATH = '/api/health/ready/'
+
+
+def database_ready(alias='default'):
+    """:return True if the database answers a trivial query"""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        logger.warning('Readiness probe failed', exc_info=True)
+        return False
+
+    return True
+
+
+class HealthCheckMiddleware:
+    """
+    Answer liveness and readiness probes before sessions, auth, host
+    validation and URL resolution run, so orchestrators can poll them
+    cheaply. Liveness only shows the process serves requests; readiness
+    also needs the database to answer.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == LIVE_PATH:
+            return JsonResponse({'status': 'ok'})
+
+        if request.path == READY_PATH:
+            if not database_ready():
+                return JsonResponse({'status': 'unavailable'}, status=503)
+            return JsonResponse({'status': 'ok'})
+
+        return self.get_response(request)
+
+
+class ServerTimingMiddleware:
+    """
+    Report query count, DB time, serializer time and render time of each
+    request in a Server-Timing header, and log requests slower than
+    SLOW_REQUEST_MS or running more than SLOW_REQUEST_QUERIES queries
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = timing.start_timer()
+        start = time.perf_counter()
+
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(
+                        conn.execute_wrapper(timer.db_wrapper))
+                response = self.get_response(request)
+        finally:
+            timing.stop_timer()
+
+        total_ms = (time.perf_counter() - start) * 1000
+        durations = {metric: seconds * 1000
+                     for metric, seconds in timer.durations.items()}
+
+        response['Server-Timing'] = ', '.join(
+            [f'db;dur={durations["db"]:.1f};desc="{timer.queries} queries"',
+             f'serializer;dur={durations["serializer"]:.1f}',
+             f'render;dur={durations["render"]:.1f}',
+             f'total;dur={total_ms:.1f}'])
+
+        slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        slow_queries = getattr(settings, 'SLOW_REQUEST_QUERIES', 50)
+
+        if total_ms > slow_ms or timer.queries > slow_queries:
+            view_name, action = view_and_action(request)
+            logger.warning(
+                'Slow request %s %s view=%s action=%s total=%.1fms '
+                'queries=%d db=%.1fms serializer=%.1fms render=%.1fms',
+                request.method, request.path, view_name, action, total_ms,
+                timer.queries, durations['db'], durations['serializer'],
+                durations['render'])
+
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the render that runs after the view returns"""
+        timer = timing.current_timer()
+        if timer is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda r: timer.add('render', time.perf_counter() - start))
+
+        return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Pin the user's reads to the primary after a request that wrote, so
+    replica lag never hides their own changes, see core.db_router
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_router.reset_writes()
+        response = self.get_response(request)
+
+        user = getattr(request, 'user', None)
+        if db_router.wrote() and user is not None and user.is_authenticated:
+            db_router.pin(user)
+
+        return response
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+FULL_TEXT_INDEX = """
+    CREATE INDEX core_recipe_title_fts ON core_recipe
+    USING gin (to_tsvector('english'::regconfig, COALESCE(title, '')))
+"""
+
+TRIGRAM_INDEX = """
+    CREATE INDEX core_recipe_title_trgm ON core_recipe
+    USING gin (title gin_trgm_ops)
+"""
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    Create the title search indexes on PostgreSQL. The trigram index is
+    skipped when the server does not ship the pg_trgm extension.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(FULL_TEXT_INDEX)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(TRIGRAM_INDEX)
+
+
+def drop_search_indexes(apps, schema_editor):
+    """Drop the title search indexes"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('DROP INDEX IF EXISTS core_recipe_title_trgm')
+    schema_editor.execute('DROP INDEX IF EXISTS core_recipe_title_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_recipe_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import SimpleTestCase
+
+from core.asgi import AsgiHandler, build_environ
+
+
+LIVE_URL = '/api/health/live/'
+
+
+def http_scope(method, path, headers=()):
+    """:return an ASGI http scope"""
+
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')] + list(headers),
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+
+
+def call(application, scope, messages):
+    """:return messages sent by application after receiving messages"""
+
+    messages = list(messages)
+    sent = []
+
+    async def receive():
+        if not messages:
+            # the client stays connected
+            await asyncio.Event().wait()
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.get_event_loop().run_until_complete(
+        application(scope, receive, send))
+
+    return sent
+
+
+def request(body=b'', more_body=False):
+    """:return an http.request message"""
+
+    return {'type': 'http.request', 'body': body, 'more_body': more_body}
+
+
+def echo(environ, start_response):
+    """WSGI application answering with the request body and its thread"""
+
+    body = environ['wsgi.input'].read()
+    start_response('201 Created', [
+        ('Content-Type', 'text/plain'),
+        ('X-Thread', threading.current_thread().name),
+    ])
+
+    return [body[:4], body[4:]]
+
+
+class AsgiHandlerTests(SimpleTestCase):
+    """Test serving the WSGI application over ASGI"""
+
+    def test_django_response(self):
+        """Test a Django view is served with its status and body"""
+
+        sent = call(AsgiHandler(WSGIHandler()), http_scope('GET', LIVE_URL),
+                    [request()])
+
+        self.assertEqual(sent[0]['type'], 'http.response.start')
+        self.assertEqual(sent[0]['status'], 200)
+        body = b''.join(message['body'] for message in sent[1:])
+        self.assertIn(b'"ok"', body)
+        self.assertFalse(sent[-1].get('more_body', False))
+
+    def test_chunked_body_buffered(self):
+        """Test a body sent in pieces reaches the application whole"""
+
+        sent = call(AsgiHandler(echo), http_scope('POST', '/'),
+                    [request(b'reci', True), request(b'pe', True),
+                     request(b'!')])
+
+        self.assertEqual(sent[0]['status'], 201)
+        body = b''.join(message['body'] for message in sent[1:])
+        self.assertEqual(body, b'recipe!')
+
+    def test_reads_and_writes_use_separate_threads(self):
+        """Test safe methods and writes run on their own pools"""
+
+        handler = AsgiHandler(echo, read_threads=1, write_threads=1)
+
+        for method, prefix in (('GET', b'asgi-read'),
+                               ('POST', b'asgi-write')):
+            sent = call(handler, http_scope(method, '/'), [request()])
+            headers = dict(sent[0]['headers'])
+            self.assertTrue(headers[b'X-Thread'].startswith(prefix))
+
+    def test_disconnect_before_body(self):
+        """Test nothing runs for a client gone before the body arrived"""
+
+        called = []
+        sent = call(AsgiHandler(lambda *args: called.append(args)),
+                    http_scope('POST', '/'),
+                    [request(b'x', True), {'type': 'http.disconnect'}])
+
+        self.assertEqual(sent, [])
+        self.assertEqual(called, [])
+
+    def test_declared_body_too_large(self):
+        """Test a Content-Length over the limit is refused unread"""
+
+        called = []
+        sent = call(AsgiHandler(lambda *args: called.append(args),
+                                max_body_size=4),
+                    http_scope('POST', '/', [(b'content-length', b'5')]),
+                    [])
+
+        self.assertEqual(sent[0]['status'], 413)
+        self.assertEqual(called, [])
+
+    def test_streamed_body_too_large(self):
+        """Test a body without a length is refused once over the limit"""
+
+        called = []
+        sent = call(AsgiHandler(lambda *args: called.append(args),
+                                max_body_size=4),
+                    http_scope('POST', '/'),
+                    [request(b'rec', True), request(b'ipe', True)])
+
+        self.assertEqual(sent[0]['status'], 413)
+        self.assertEqual(called, [])
+
+    def test_disconnect_stops_streaming(self):
+        """Test a client leaving mid response stops and closes the body"""
+
+        produced = []
+        closed = threading.Event()
+
+        def chunks():
+            try:
+                for n in range(10000):
+                    produced.append(n)
+                    yield b'x' * 1024
+            finally:
+                closed.set()
+
+        def stream(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return chunks()
+
+        call(AsgiHandler(stream), http_scope('GET', '/'),
+             [request(), {'type': 'http.disconnect'}])
+
+        self.assertTrue(closed.is_set())
+        self.assertLess(len(produced), 10000)
+
+    def test_repeated_headers_joined(self):
+        """Test split cookie headers join with ';', others with ','"""
+
+        environ = build_environ(http_scope('GET', '/', [
+            (b'cookie', b'a=1'), (b'cookie', b'b=2'),
+            (b'accept', b'text/html'), (b'accept', b'*/*')]), None, 0)
+
+        self.assertEqual(environ['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,*/*')
+
+    def test_lifespan(self):
+        """Test startup and shutdown are acknowledged"""
+
+        sent = call(AsgiHandler(echo), {'type': 'lifespan'},
+                    [{'type': 'lifespan.startup'},
+                     {'type': 'lifespan.shutdown'}])
+
+        self.assertEqual([message['type'] for message in sent],
+                         ['lifespan.startup.complete',
+                          'lifespan.shutdown.complete'])
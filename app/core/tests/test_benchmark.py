@@ -0,0 +1,85 @@
+from django.test import SimpleTestCase
+from django.urls import resolve
+
+from core import benchmark
+from recipe.urls import router
+
+
+class BenchmarkTests(SimpleTestCase):
+    """Test the benchmark report helpers"""
+
+    def test_query_count_from_server_timing(self):
+        """Test the query count is read from the Server-Timing header"""
+
+        header = 'db;dur=1.2;desc="7 queries", total;dur=3.0'
+
+        self.assertEqual(benchmark.query_count(header), 7)
+        self.assertIsNone(benchmark.query_count(None))
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+
+        values = list(range(1, 101))
+
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 95), 95)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([4], 99), 4)
+        self.assertIsNone(benchmark.percentile([], 50))
+
+    def test_run_endpoint_report(self):
+        """Test every request is sent and summarized"""
+
+        endpoint = benchmark.Endpoint('tags', 'GET', '/tags/', None, {})
+        calls = []
+
+        def transport(sent):
+            calls.append(sent)
+            status = 500 if len(calls) == 1 else 200
+            return status, 'db;dur=1.0;desc="2 queries"'
+
+        report = benchmark.run_endpoint(transport, endpoint,
+                                        concurrency=3, requests=10)
+
+        self.assertEqual(len(calls), 10)
+        self.assertEqual(report['endpoint'], 'tags')
+        self.assertEqual(report['requests'], 10)
+        self.assertEqual(report['errors'], 1)
+        self.assertEqual(report['queries_per_request'], 2)
+        for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            self.assertIsNotNone(report[key])
+
+    def test_paths_cycled(self):
+        """Test successive requests use the next path"""
+
+        endpoint = benchmark.Endpoint('delete', 'DELETE', '/a/', None, {},
+                                      paths=['/a/', '/b/'])
+        sent = []
+
+        def transport(request):
+            sent.append(request.path)
+            return 204, None
+
+        benchmark.run_endpoint(transport, endpoint, concurrency=1,
+                               requests=4)
+
+        self.assertEqual(sent, ['/a/', '/b/', '/a/', '/b/'])
+
+    def test_every_router_route_driven(self):
+        """Test the endpoints reach every route and method of the router"""
+
+        throwaway = benchmark.Throwaway(
+            tag_id=1, ingredient_id=2, recipe_id=3, image_recipe_id=4,
+            delete_ids=[5, 6], image=b'jpeg')
+        endpoints = benchmark.build_endpoints('a@b.com', 'pw', 'key', 7,
+                                              throwaway)
+
+        driven = {(resolve(endpoint.path.split('?')[0]).url_name,
+                   endpoint.method) for endpoint in endpoints}
+        for pattern in router.get_urls():
+            if pattern.name == 'api-root':
+                continue
+            methods = [method.upper()
+                       for method in pattern.callback.actions]
+            for method in methods:
+                self.assertIn((pattern.name, method), driven)
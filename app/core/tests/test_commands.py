@@ -1,7 +1,14 @@
-from unittest.mock import patch
+import json
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from core.models import Recipe, Tag, Ingredients
 
 
 class CommandTests(TestCase):
@@ -12,9 +19,11 @@ class CommandTests(TestCase):
         """
 
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
+            gi.return_value = MagicMock()
+            call_command('wait_for_db', stdout=StringIO())
             self.assertEqual(gi.call_count, 1)
+            gi.return_value.cursor.return_value.__enter__.return_value.\
+                execute.assert_called_once_with('SELECT 1')
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
@@ -22,6 +31,76 @@ class CommandTests(TestCase):
         Test waiting for db
         """
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError]*5 + [True]
-            call_command('wait_for_db')
+            gi.side_effect = [OperationalError]*5 + [MagicMock()]
+            call_command('wait_for_db', stdout=StringIO())
             self.assertEqual(gi.call_count, 6)
+            self.assertEqual(ts.call_count, 5)
+
+    @patch('random.uniform', side_effect=lambda low, high: high)
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_backoff(self, ts, uniform):
+        """
+        Test retry delays double up to the maximum
+        """
+        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
+            gi.side_effect = [OperationalError]*5 + [MagicMock()]
+            call_command('wait_for_db', initial_delay=0.5, max_delay=3,
+                         stdout=StringIO())
+
+        delays = [call[0][0] for call in ts.call_args_list]
+        self.assertEqual(delays, [0.5, 1, 2, 3, 3])
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_timeout(self, ts):
+        """
+        Test giving up once the timeout has passed
+        """
+        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
+            gi.side_effect = OperationalError
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', timeout=0, stdout=StringIO())
+            self.assertEqual(ts.call_count, 0)
+
+    def test_seed_data(self):
+        """
+        Test seeding users with recipes, tags, ingredients and links
+        """
+        call_command('seed_data', users=2, recipes=5, tags=4,
+                     ingredients=6, tags_per_recipe=2,
+                     ingredients_per_recipe=3, prefix='seed',
+                     stdout=StringIO())
+
+        users = get_user_model().objects.filter(email__startswith='seed-')
+        self.assertEqual(users.count(), 2)
+        self.assertTrue(users[0].check_password('benchmark-password'))
+        self.assertEqual(Token.objects.filter(user__in=users).count(), 2)
+        self.assertEqual(Recipe.objects.count(), 10)
+        self.assertEqual(Tag.objects.count(), 8)
+        self.assertEqual(Ingredients.objects.count(), 12)
+        self.assertEqual(Recipe.tag.through.objects.count(), 20)
+        self.assertEqual(Recipe.ingredients.through.objects.count(), 30)
+        for recipe in Recipe.objects.all():
+            self.assertEqual(
+                {tag.user_id for tag in recipe.tag.all()}, {recipe.user_id})
+
+    def test_benchmark_needs_seeded_user(self):
+        """
+        Test benchmark refuses to run without seed data
+        """
+        with self.assertRaises(CommandError):
+            call_command('benchmark', prefix='missing', stdout=StringIO())
+
+    def test_benchmark_serializers_identical(self):
+        """
+        Test the serializer benchmark reports both paths as identical
+        """
+        call_command('seed_data', users=1, recipes=3, tags=2,
+                     ingredients=2, tags_per_recipe=2,
+                     ingredients_per_recipe=2, stdout=StringIO())
+        out = StringIO()
+
+        call_command('benchmark_serializers', repeat=1, stdout=out)
+
+        paths = json.loads(out.getvalue())['paths']
+        self.assertTrue(paths['list']['identical'])
+        self.assertTrue(paths['detail']['identical'])
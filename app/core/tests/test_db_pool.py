@@ -0,0 +1,240 @@
+import threading
+from unittest import skipUnless
+from unittest.mock import patch
+
+import psycopg2
+from psycopg2 import extensions
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.db_pool import pool
+
+
+POOL_URL = reverse('core:db-pool')
+
+
+class FakeCursor:
+    """Cursor of a FakeConnection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql):
+        if self.conn.broken:
+            self.conn.closed = 2
+            raise psycopg2.OperationalError('server closed the connection')
+
+
+class FakeConnection:
+    """Stand-in for a psycopg2 connection"""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.autocommit = True
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        if self.closed:
+            return extensions.TRANSACTION_STATUS_UNKNOWN
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(**kwargs):
+    """:return a pool of fake connections"""
+
+    return pool.ConnectionPool(FakeConnection, **kwargs)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test connection reuse, limits and health checks"""
+
+    def test_connection_reused(self):
+        """Test a released connection is handed out again"""
+
+        db_pool = make_pool()
+        conn = db_pool.acquire()
+        db_pool.release(conn)
+
+        self.assertIs(db_pool.acquire(), conn)
+        self.assertEqual(db_pool.stats()['created'], 1)
+
+    def test_overflow_closed_on_release(self):
+        """Test connections beyond size are closed when returned"""
+
+        db_pool = make_pool(size=1, overflow=1)
+        first, second = db_pool.acquire(), db_pool.acquire()
+
+        db_pool.release(first)
+        db_pool.release(second)
+
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+        stats = db_pool.stats()
+        self.assertEqual((stats['open'], stats['idle']), (1, 1))
+
+    def test_checkout_times_out(self):
+        """Test waiting for a full pool gives up after the timeout"""
+
+        db_pool = make_pool(size=1, overflow=0, timeout=0.01)
+        db_pool.acquire()
+
+        with self.assertRaises(pool.PoolTimeout):
+            db_pool.acquire()
+
+        self.assertEqual(db_pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_released_connection(self):
+        """Test a waiting checkout is served by a release"""
+
+        db_pool = make_pool(size=1, overflow=0, timeout=5)
+        conn = db_pool.acquire()
+        result = []
+        waiter = threading.Thread(
+            target=lambda: result.append(db_pool.acquire()))
+        waiter.start()
+
+        while db_pool.stats()['waiting'] == 0:
+            pass
+        db_pool.release(conn)
+        waiter.join()
+
+        self.assertEqual(result, [conn])
+
+    def test_idle_connection_expires(self):
+        """Test connections idle past the timeout are closed"""
+
+        db_pool = make_pool(idle_timeout=60)
+        conn = db_pool.acquire()
+        db_pool.release(conn)
+
+        with patch('core.db_pool.pool.time.monotonic',
+                   return_value=pool.time.monotonic() + 61):
+            fresh = db_pool.acquire()
+
+        self.assertTrue(conn.closed)
+        self.assertIsNot(fresh, conn)
+        self.assertEqual(db_pool.stats()['recycled'], 1)
+
+    def test_failed_ping_retires_all_connections(self):
+        """Test a dead connection retires every older one, as on failover"""
+
+        db_pool = make_pool()
+        first, second = db_pool.acquire(), db_pool.acquire()
+        db_pool.release(first)
+        db_pool.release(second)
+        second.broken = True
+
+        with self.assertLogs('core.db_pool.pool', 'WARNING'):
+            conn = db_pool.acquire()
+
+        self.assertNotIn(conn, (first, second))
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+        stats = db_pool.stats()
+        self.assertEqual((stats['open'], stats['in_use']), (1, 1))
+        self.assertEqual(stats['recycled'], 2)
+
+    def test_broken_connection_not_returned(self):
+        """Test a connection lost while in use is closed on release"""
+
+        db_pool = make_pool()
+        conn = db_pool.acquire()
+        conn.closed = 2
+
+        db_pool.release(conn)
+
+        self.assertIsNot(db_pool.acquire(), conn)
+
+    def test_open_transaction_rolled_back(self):
+        """Test a connection returned mid transaction is rolled back"""
+
+        db_pool = make_pool()
+        conn = db_pool.acquire()
+        conn.status = extensions.TRANSACTION_STATUS_INTRANS
+
+        db_pool.release(conn)
+
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertIs(db_pool.acquire(), conn)
+
+    def test_failed_connect_frees_slot(self):
+        """Test a failed connect does not leak a pool slot"""
+
+        db_pool = pool.ConnectionPool(
+            lambda: (_ for _ in ()).throw(psycopg2.OperationalError()),
+            size=1, overflow=0)
+
+        with self.assertRaises(psycopg2.OperationalError):
+            db_pool.acquire()
+
+        self.assertEqual(db_pool.stats()['open'], 0)
+
+
+class DatabasePoolViewTests(TestCase):
+    """Test the pool statistics endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_requires_staff(self):
+        """Test regular users cannot read pool statistics"""
+
+        user = get_user_model().objects.create_user(
+            "pool@gmail.com", "password123")
+        self.client.force_authenticate(user)
+
+        res = self.client.get(POOL_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reports_pools(self):
+        """Test staff see the pools of the serving process"""
+
+        user = get_user_model().objects.create_superuser(
+            "pool-admin@gmail.com", "password123")
+        self.client.force_authenticate(user)
+
+        res = self.client.get(POOL_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('pid', res.data)
+        for stats in res.data['pools']:
+            self.assertNotIn('password', stats)
+            self.assertIn('in_use', stats)
+
+
+@skipUnless(connection.vendor == 'postgresql', "pooling is PostgreSQL only")
+class PooledBackendTests(TestCase):
+    """Test the database backend draws from the pool"""
+
+    def test_connection_checked_out_of_pool(self):
+        """Test the open connection is counted as in use"""
+
+        connection.ensure_connection()
+
+        self.assertGreaterEqual(connection.pool.stats()['in_use'], 1)
+        self.assertTrue(pool.ping(connection.connection))
@@ -0,0 +1,149 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import db_router
+from core.models import Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def sample_recipe(user, **params):
+    """Create and return a sample recipe"""
+
+    defaults = {"title": "Sample recipe", "time_minutes": 10, "price": 5.00}
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'])
+class ReplicaRouterTests(TestCase):
+    """Test which database the router picks"""
+
+    def setUp(self):
+        cache.clear()
+        db_router.reset_writes()
+        self.router = db_router.ReplicaRouter()
+        self.user = get_user_model().objects.create_user(
+            "router@gmail.com", "password123")
+        db_router.reset_writes()
+
+    def test_reads_outside_block_use_primary(self):
+        """Test reads go to the primary unless a view asks for a replica"""
+
+        self.assertEqual(self.router.db_for_read(Recipe), 'default')
+
+    def test_reads_inside_block_use_replica(self):
+        """Test replica_reads sends reads to a replica, then restores"""
+
+        with db_router.replica_reads(self.user):
+            self.assertEqual(self.router.db_for_read(Recipe), 'replica_0')
+
+        self.assertEqual(self.router.db_for_read(Recipe), 'default')
+
+    def test_pinned_user_reads_primary(self):
+        """Test a user who wrote recently reads from the primary"""
+
+        db_router.pin(self.user)
+
+        with db_router.replica_reads(self.user):
+            self.assertEqual(self.router.db_for_read(Recipe), 'default')
+
+    def test_write_sends_later_reads_to_primary(self):
+        """Test reads after a write in the same request use the primary"""
+
+        with db_router.replica_reads(self.user):
+            self.assertEqual(self.router.db_for_write(Recipe), 'default')
+            self.assertEqual(self.router.db_for_read(Recipe), 'default')
+
+        self.assertTrue(db_router.wrote())
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test reads stay on the primary without replicas"""
+
+        with db_router.replica_reads(self.user):
+            self.assertEqual(self.router.db_for_read(Recipe), 'default')
+
+
+class ReplicaPinMiddlewareTests(TestCase):
+    """Test users are pinned to the primary after writing"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "pin@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def test_write_pins_user(self):
+        """Test creating a tag pins the user"""
+
+        res = self.client.post(TAGS_URL, {"name": "Vegan"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(db_router.pinned(self.user))
+
+    def test_read_does_not_pin_user(self):
+        """Test listing does not pin the user"""
+
+        Tag.objects.create(user=self.user, name="Vegan")
+
+        self.client.get(TAGS_URL)
+        self.client.get(RECIPES_URL)
+
+        self.assertFalse(db_router.pinned(self.user))
+
+
+@skipUnless(settings.DATABASE_REPLICAS,
+            'set DB_REPLICA_HOSTS to test against a replica database')
+class ReplicaReadTests(TransactionTestCase):
+    """
+    Test list and detail reads against a real replica alias. The test
+    replica is a separate database that is never written, so rows only
+    show up if the read went to the primary.
+    """
+
+    multi_db = True
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "replica@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        self.recipe = sample_recipe(self.user)
+
+    def test_list_reads_replica(self):
+        """Test an unpinned user's list is read from the replica"""
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [])
+
+    def test_reads_own_writes(self):
+        """Test a user sees their recipes right after creating one"""
+
+        res = self.client.post(RECIPES_URL, {
+            "title": "Biryani", "time_minutes": 45, "price": "8.00",
+            "tag": [], "ingredients": []}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        listed = self.client.get(RECIPES_URL)
+        detail = self.client.get(reverse('recipe:recipe-detail',
+                                         args=[self.recipe.id]))
+
+        self.assertEqual(len(listed.data["results"]), 2)
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
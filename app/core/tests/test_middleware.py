@@ -0,0 +1,134 @@
+import re
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db.utils import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+LIVE_URL = '/api/health/live/'
+
+READY_URL = '/api/health/ready/'
+
+
+def timings(res):
+    """:return {metric: (duration, description)} from Server-Timing"""
+
+    metrics = {}
+    for entry in res['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        params = dict(param.split('=', 1) for param in params)
+        metrics[name] = (float(params['dur']), params.get('desc'))
+
+    return metrics
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    """Test the Server-Timing header and slow request log"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "timing@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        for n in range(3):
+            Recipe.objects.create(user=self.user, title=f"Recipe {n}",
+                                  time_minutes=10, price=5.00)
+
+    @override_settings(DEBUG=False)
+    def test_header_reports_queries_and_phases(self):
+        """Test every phase is reported without DEBUG"""
+
+        res = self.client.get(RECIPES_URL)
+
+        metrics = timings(res)
+        self.assertEqual(set(metrics),
+                         {'db', 'serializer', 'render', 'total'})
+        # recipes, then the tag and ingredient prefetches
+        self.assertEqual(metrics['db'][1], '"3 queries"')
+        self.assertGreater(metrics['serializer'][0], 0)
+        self.assertGreater(metrics['render'][0], 0)
+        self.assertGreaterEqual(metrics['total'][0], metrics['db'][0])
+
+    def test_header_on_unauthenticated_request(self):
+        """Test error responses are timed too"""
+
+        res = APIClient().get(RECIPES_URL)
+
+        self.assertIn('total;dur=', res['Server-Timing'])
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request_logged(self):
+        """Test requests over the time threshold are logged"""
+
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            self.client.get(RECIPES_URL)
+
+        self.assertIn('view=recipe:recipe-list', logs.output[0])
+        self.assertIn('action=list', logs.output[0])
+        self.assertTrue(re.search(r'queries=3\b', logs.output[0]))
+
+    @override_settings(SLOW_REQUEST_QUERIES=2)
+    def test_query_heavy_request_logged(self):
+        """Test requests over the query threshold are logged"""
+
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            self.client.get(RECIPES_URL)
+
+        self.assertIn('Slow request GET', logs.output[0])
+
+    def test_fast_request_not_logged(self):
+        """Test requests under both thresholds are not logged"""
+
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('core.middleware', 'WARNING'):
+                self.client.get(RECIPES_URL)
+
+
+class HealthCheckMiddlewareTests(TestCase):
+    """Test the liveness and readiness probes"""
+
+    def test_live(self):
+        """Test liveness answers without queries or authentication"""
+
+        with self.assertNumQueries(0):
+            res = self.client.get(LIVE_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {'status': 'ok'})
+        self.assertNotIn('Server-Timing', res)
+        self.assertNotIn('Set-Cookie', res)
+
+    def test_probes_skip_host_validation(self):
+        """Test probes addressed to a pod IP are answered"""
+
+        res = self.client.get(LIVE_URL, HTTP_HOST='10.1.2.3:8000')
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_ready(self):
+        """Test readiness runs one query when the database is up"""
+
+        with self.assertNumQueries(1):
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_not_ready(self):
+        """Test readiness fails when the database does not answer"""
+
+        with patch('core.middleware.connections') as conns:
+            conns.__getitem__.return_value.cursor.side_effect = \
+                OperationalError('connection refused')
+            with self.assertLogs('core.middleware', 'WARNING'):
+                res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.json(), {'status': 'unavailable'})
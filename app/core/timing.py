@@ -0,0 +1,65 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+_local = threading.local()
+
+
+class RequestTimer:
+    """Per-request query count and time spent per phase, in seconds"""
+
+    def __init__(self):
+        self.queries = 0
+        self.durations = {'db': 0.0, 'serializer': 0.0, 'render': 0.0}
+
+    def add(self, metric, seconds):
+        """Add time spent in a phase"""
+        self.durations[metric] += seconds
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook counting and timing queries"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add('db', time.perf_counter() - start)
+
+
+def start_timer():
+    """Start timing the current request and return its timer"""
+    _local.timer = RequestTimer()
+
+    return _local.timer
+
+
+def stop_timer():
+    """Stop timing the current request"""
+    _local.timer = None
+
+
+def current_timer():
+    """:return the timer of the request being handled, if any"""
+    return getattr(_local, 'timer', None)
+
+
+@contextmanager
+def measure(metric):
+    """Add the time spent in the block to the current request"""
+    timer = current_timer()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timer is not None:
+            timer.add(metric, time.perf_counter() - start)
+
+
+class TimedDataMixin:
+    """Serializer mixin recording the time spent building `.data`"""
+
+    @property
+    def data(self):
+        with measure('serializer'):
+            return super().data
@@ -0,0 +1,33 @@
+import os
+
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.db_pool import pool
+from user.authentication import CachedTokenAuthentication
+
+
+POOL_LABEL_PARAMS = ('host', 'port', 'database', 'user')
+
+
+class DatabasePoolView(APIView):
+    """
+    Report the database pool counters of the worker process serving
+    the request, for sizing the pool per worker
+    """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request, format=None):
+        """:return pid and the stats of every pool in this process"""
+        pools = []
+        for key, db_pool in pool.all_pools().items():
+            params = dict(key)
+            pools.append({
+                **{name: params[name] for name in POOL_LABEL_PARAMS
+                   if name in params},
+                **db_pool.stats(),
+            })
+
+        return Response({'pid': os.getpid(), 'pools': pools})
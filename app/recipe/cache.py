@@ -0,0 +1,141 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core import db_router
+
+
+LIST_TIMEOUT = getattr(settings, 'RECIPE_LIST_CACHE_TIMEOUT', 300)
+LOCK_TIMEOUT = getattr(settings, 'RECIPE_LIST_CACHE_LOCK_TIMEOUT', 10)
+LOCK_WAIT = 0.05
+LOCK_RETRIES = 20
+
+
+def _version_key(model, user_id):
+    """:return cache key holding the list version for a user"""
+
+    return f'recipe:list-version:{model._meta.label_lower}:{user_id}'
+
+
+def get_version(model, user_id):
+    """
+    Return current list version for user, starting a new one if the key
+    is missing. Versions start from the clock so an evicted key never
+    brings back entries written under an older version.
+    """
+    key = _version_key(model, user_id)
+    version = cache.get(key)
+
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+
+    return version
+
+
+def _changed_key(model, user_id):
+    """:return cache key holding when the user's lists last changed"""
+
+    return f'recipe:list-changed:{model._meta.label_lower}:{user_id}'
+
+
+def last_changed(model, user_id):
+    """
+    Return when the user's `model` lists last changed, as a timestamp.
+    This covers rows leaving a list, which leave no updated_at behind.
+    A missing key counts as a change right now.
+    """
+    key = _changed_key(model, user_id)
+    changed = cache.get(key)
+
+    if changed is None:
+        changed = time.time()
+        if not cache.add(key, changed, None):
+            changed = cache.get(key, changed)
+
+    return changed
+
+
+def _bump(model, user_id):
+    """Record a change to the user's `model` lists and start a version"""
+    cache.set(_changed_key(model, user_id), time.time(), None)
+
+    key = _version_key(model, user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        get_version(model, user_id)
+
+
+def invalidate(model, user_id):
+    """
+    Record that the user's `model` lists changed and drop every cached
+    one. Inside a transaction the version is bumped again on commit, as
+    a list read before then is rebuilt from the old rows and cached
+    under the first bump.
+    """
+    _bump(model, user_id)
+
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(model, user_id))
+
+
+def cacheable(model, user_id):
+    """
+    :return False while reads go to a replica that may not have the
+    user's last change to `model` lists yet. A page built there would be
+    cached under the new version and served to the pinned writer.
+    """
+    if not db_router.reading_replica():
+        return True
+
+    changed = last_changed(model, user_id)
+    return time.time() - changed >= settings.REPLICA_PIN_SECONDS
+
+
+def list_cache_key(model, request):
+    """
+    :return cache key for a list response, keyed by user, list version
+    and the full request URI (assigned_only, cursor and page_size)
+    """
+    user_id = request.user.pk
+    digest = hashlib.md5(
+        request.build_absolute_uri().encode('utf-8')).hexdigest()
+
+    return (f'recipe:list:{model._meta.label_lower}:{user_id}:'
+            f'{get_version(model, user_id)}:{digest}')
+
+
+def get_or_build(key, build, store=True):
+    """
+    Return cached value for key, calling `build` on a miss.
+    Only one caller rebuilds a missing key at a time; the others wait
+    briefly for its result instead of all hitting the database.
+    With store False a miss is built but not cached.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    if not store:
+        return build()
+
+    lock_key = f'{key}:lock'
+    for attempt in range(LOCK_RETRIES):
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                value = build()
+                cache.set(key, value, LIST_TIMEOUT)
+                return value
+            finally:
+                cache.delete(lock_key)
+
+        time.sleep(LOCK_WAIT)
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+    return build()
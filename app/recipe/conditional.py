@@ -0,0 +1,90 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, \
+    patch_cache_control
+from django.utils.http import http_date
+
+from recipe import cache
+
+
+def digest(*parts):
+    """:return md5 hex digest of the given parts"""
+
+    return hashlib.md5(
+        ":".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def row_version(obj):
+    """:return (pk, updated_at) of a model instance or a values() row"""
+    if isinstance(obj, dict):
+        return obj["id"], obj["updated_at"]
+
+    return obj.pk, obj.updated_at
+
+
+def page_state(page, paginator):
+    """
+    :return {"digest", "latest"} of a list page. Any write to a row bumps
+    its updated_at and rows joining or leaving the page change its ids,
+    so the digest changes whenever the page does.
+    """
+    versions = [row_version(obj) for obj in page]
+    rows = [(pk, updated_at.isoformat()) for pk, updated_at in versions]
+
+    return {
+        "digest": digest(rows, paginator.has_next, paginator.has_previous),
+        "latest": max((updated_at for _, updated_at in versions),
+                      default=None),
+    }
+
+
+def timestamp(value):
+    """:return whole seconds since the epoch of a datetime, or 0"""
+
+    return int(value.timestamp()) if value is not None else 0
+
+
+def list_validators(request, model, state):
+    """:return (etag, last_modified) of a list page"""
+    user_id = request.user.pk
+    etag = digest(model._meta.label_lower, user_id, request.get_full_path(),
+                  request.accepted_renderer.format, state["digest"])
+    last_modified = max(timestamp(state["latest"]),
+                        int(cache.last_changed(model, user_id)))
+
+    return f'"{etag}"', last_modified
+
+
+def object_validators(request, model, obj):
+    """:return (etag, last_modified) of a model instance or values() row"""
+    pk, updated_at = row_version(obj)
+    etag = digest(model._meta.label_lower, pk,
+                  request.accepted_renderer.format, updated_at.isoformat())
+
+    return f'"{etag}"', timestamp(updated_at)
+
+
+def check(request, etag, last_modified):
+    """
+    Evaluate If-Match, If-Unmodified-Since, If-None-Match and
+    If-Modified-Since.
+    :return a 304 or 412 response, or None to carry on
+    """
+    response = get_conditional_response(request, etag=etag,
+                                        last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Add ETag and Last-Modified to a response. It holds per-user data, so
+    clients must revalidate before reusing it.
+    """
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+
+    return response
@@ -0,0 +1,81 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.models import Recipe
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = ('id', 'title', 'time_minutes', 'price', 'link')
+
+CSV_HEADER = EXPORT_FIELDS + ('tags', 'ingredients')
+
+
+class Echo:
+    """Pseudo buffer that hands back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def _names_by_recipe(through, field, recipe_ids):
+    """:return {recipe_id: [names]} for one side of a recipe M2M"""
+    names = {}
+    rows = through.objects.\
+        filter(recipe_id__in=recipe_ids).\
+        order_by(f'{field}__name').\
+        values_list('recipe_id', f'{field}__name')
+
+    for recipe_id, name in rows:
+        names.setdefault(recipe_id, []).append(name)
+
+    return names
+
+
+def iter_recipes(user, chunk_size=None):
+    """
+    Yield a dict per recipe of the user, with tag and ingredient names.
+    Recipes are read through a server-side cursor and the names are
+    loaded per chunk, so memory does not grow with the account size.
+    """
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    rows = Recipe.objects.\
+        filter(user=user).\
+        order_by('id').\
+        values(*EXPORT_FIELDS).\
+        iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+
+        recipe_ids = [row['id'] for row in chunk]
+        tags = _names_by_recipe(Recipe.tag.through, 'tag', recipe_ids)
+        ingredients = _names_by_recipe(Recipe.ingredients.through,
+                                       'ingredients', recipe_ids)
+
+        for row in chunk:
+            row['tags'] = tags.get(row['id'], [])
+            row['ingredients'] = ingredients.get(row['id'], [])
+            yield row
+
+
+def ndjson_lines(recipes):
+    """Yield one JSON document per line"""
+    for recipe in recipes:
+        yield json.dumps(recipe, cls=DjangoJSONEncoder) + '\n'
+
+
+def csv_lines(recipes):
+    """Yield CSV lines, tag and ingredient names joined by '|'"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+
+    for recipe in recipes:
+        yield writer.writerow(
+            [recipe[field] for field in EXPORT_FIELDS] +
+            ['|'.join(recipe['tags']), '|'.join(recipe['ingredients'])])
@@ -0,0 +1,85 @@
+from django.db.models import Count, Exists, IntegerField, OuterRef, \
+    Subquery
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+
+from core.models import Recipe
+
+
+MATCH_MODES = ('any', 'all')
+
+
+def parse_mode(query_params, param):
+    """:return the match mode named by `param`, `any` by default"""
+    mode = query_params.get(param, 'any')
+    if mode not in MATCH_MODES:
+        raise ValidationError({param: ['Expected all or any']})
+
+    return mode
+
+
+def filter_related(queryset, field, ids, mode):
+    """
+    Filter recipes linked to any or to all of the given related ids of
+    an M2M field. Both read the through table in a subquery instead of
+    joining it, so each recipe comes back once however many ids match:
+    `any` as a correlated EXISTS, `all` as the recipes whose matching
+    links, grouped by recipe, cover every id.
+    """
+    m2m = Recipe._meta.get_field(field)
+    through = m2m.remote_field.through
+    column = m2m.m2m_reverse_field_name()
+    links = through.objects.filter(**{f'{column}__in': set(ids)})
+
+    if mode == 'all':
+        covering = links.values('recipe_id').\
+            annotate(matched=Count(column, distinct=True)).\
+            filter(matched=len(set(ids))).\
+            values('recipe_id')
+        return queryset.filter(pk__in=covering)
+
+    # Django 2.1 filters on Exists only through an annotation
+    annotation = f'has_{field}'
+    return queryset.\
+        annotate(**{annotation: Exists(links.filter(
+            recipe_id=OuterRef('pk')))}).\
+        filter(**{annotation: True})
+
+
+def recipe_links(model):
+    """
+    :return (through model, its field pointing at model) of the Recipe
+    M2M to a tag or ingredient model
+    """
+    m2m = next(field for field in Recipe._meta.many_to_many
+               if field.related_model is model)
+
+    return m2m.remote_field.through, m2m.m2m_reverse_field_name()
+
+
+def with_recipe_count(queryset):
+    """
+    Annotate tags or ingredients with `recipe_count`, counted by a
+    correlated subquery on the through table's index, so the rows are
+    neither joined to every link nor grouped.
+    """
+    through, column = recipe_links(queryset.model)
+    counts = through.objects.\
+        filter(**{column: OuterRef('pk')}).\
+        order_by().\
+        values(column).\
+        annotate(count=Count('*')).\
+        values('count')
+
+    return queryset.annotate(recipe_count=Coalesce(
+        Subquery(counts, output_field=IntegerField()), 0))
+
+
+def assigned(queryset):
+    """Keep tags or ingredients used by a recipe, as an EXISTS semi-join"""
+    through, column = recipe_links(queryset.model)
+
+    return queryset.\
+        annotate(assigned=Exists(
+            through.objects.filter(**{column: OuterRef('pk')}))).\
+        filter(assigned=True)
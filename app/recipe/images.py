@@ -0,0 +1,157 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image
+
+from core.models import Recipe
+
+
+logger = logging.getLogger(__name__)
+
+EXIF_ORIENTATION = 274
+
+ORIENTATION_TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """:return the process wide image worker pool"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'RECIPE_IMAGE_WORKERS', 2),
+                thread_name_prefix='recipe-image')
+
+    return _executor
+
+
+def schedule_processing(recipe):
+    """Process the recipe image on the worker pool once committed"""
+    recipe_id, image_name = recipe.pk, recipe.image.name
+
+    transaction.on_commit(
+        lambda: get_executor().submit(run_job, recipe_id, image_name))
+
+
+def apply_orientation(img):
+    """Rotate the pixels to match the EXIF orientation tag"""
+    try:
+        exif = img._getexif() or {}
+    except (AttributeError, IndexError, KeyError, OSError):
+        exif = {}
+
+    method = ORIENTATION_TRANSPOSE.get(exif.get(EXIF_ORIENTATION))
+
+    return img.transpose(method) if method is not None else img
+
+
+def encode_jpeg(img):
+    """:return JPEG bytes for the image, without any EXIF data"""
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG',
+             quality=getattr(settings, 'RECIPE_IMAGE_QUALITY', 85),
+             optimize=True)
+
+    return buffer.getvalue()
+
+
+def render_derivatives(fp):
+    """
+    Decode an uploaded image and return (normalized, thumbnail) JPEG
+    bytes. Normalizing applies the EXIF orientation, converts to RGB and
+    re-encodes, which drops EXIF and any other metadata.
+    """
+    img = Image.open(fp)
+    img.load()
+    img = apply_orientation(img).convert('RGB')
+
+    normalized = encode_jpeg(img)
+
+    size = getattr(settings, 'RECIPE_THUMBNAIL_SIZE', (320, 320))
+    img.thumbnail(size, Image.LANCZOS)
+
+    return normalized, encode_jpeg(img)
+
+
+def process_recipe_image(recipe_id, image_name):
+    """
+    Replace the stored original with its normalized version and add a
+    thumbnail. Results are only written if the recipe still holds the
+    same upload, so a newer upload is never overwritten.
+    """
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is None or recipe.image.name != image_name:
+        return
+
+    storage = recipe.image.storage
+    with storage.open(image_name) as fp:
+        normalized, thumbnail = render_derivatives(fp)
+
+    base = os.path.splitext(os.path.basename(image_name))[0]
+    image_field = Recipe._meta.get_field('image')
+    thumbnail_field = Recipe._meta.get_field('thumbnail')
+    new_image = storage.save(
+        image_field.generate_filename(recipe, f'{base}.jpg'),
+        ContentFile(normalized))
+    new_thumbnail = thumbnail_field.storage.save(
+        thumbnail_field.generate_filename(recipe, f'{base}.jpg'),
+        ContentFile(thumbnail))
+
+    updated = Recipe.objects.\
+        filter(pk=recipe_id, image=image_name).\
+        update(image=new_image, thumbnail=new_thumbnail,
+               image_status=Recipe.IMAGE_READY, updated_at=timezone.now())
+
+    if updated:
+        storage.delete(image_name)
+    else:
+        storage.delete(new_image)
+        thumbnail_field.storage.delete(new_thumbnail)
+
+
+def run_job(recipe_id, image_name):
+    """Worker entry point, records failures on the recipe"""
+    try:
+        process_recipe_image(recipe_id, image_name)
+    except Exception:
+        logger.exception('Processing image %s of recipe %s failed',
+                         image_name, recipe_id)
+        Recipe.objects.\
+            filter(pk=recipe_id, image=image_name).\
+            update(image_status=Recipe.IMAGE_FAILED,
+                   updated_at=timezone.now())
+    finally:
+        connection.close()
+
+
+def stale_pending(older_than):
+    """
+    :return (recipe id, image name) of uploads still pending after
+    `older_than` seconds. Jobs only live in the process that queued
+    them, so these were lost to a restart or crash.
+    """
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+
+    return Recipe.objects.\
+        filter(image_status=Recipe.IMAGE_PENDING, updated_at__lt=cutoff).\
+        order_by('id').values_list('id', 'image')
@@ -0,0 +1,184 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, \
+    patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.negotiation import BaseContentNegotiation
+
+from recipe import conditional
+
+
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_url(field, recipe_id, request=None):
+    """
+    :return URL of the view serving a recipe's image or thumbnail to its
+    owner
+    """
+    url = reverse(f'recipe:recipe-{field}', args=[recipe_id])
+
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    Pick the first renderer whatever the Accept header says, so clients
+    asking for image/* get the file rather than a 406. Only errors are
+    rendered.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def validators(stat):
+    """:return (etag, last_modified) of a stored file"""
+    etag = conditional.digest(stat.st_size, stat.st_mtime_ns)
+
+    return f'"{etag}"', int(stat.st_mtime)
+
+
+def parse_range(header, size):
+    """
+    :return (start, end) inclusive of a single byte range, None to send
+    the whole file, or False if the range is unsatisfiable. Multiple
+    ranges are answered with the whole file, which RFC 7233 allows.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # suffix range: the last N bytes
+        if int(last) == 0:
+            return False
+        return max(size - int(last), 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return False
+    if end < start:
+        return None
+
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """:return True unless If-Range names another version of the file"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(path, start, length):
+    """Yield `length` bytes of the file from `start`"""
+    with open(path, 'rb') as fp:
+        fp.seek(start)
+        while length > 0:
+            chunk = fp.read(min(MEDIA_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, path, stat, content_type):
+    """
+    :return a FileResponse of the whole file, or a 206 of the byte range
+    requested. Whole files go through wsgi.file_wrapper when the server
+    provides one, so it can use sendfile.
+    """
+    etag, last_modified = validators(stat)
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and \
+            if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416, content_type=content_type)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+    elif byte_range is not None:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(path, start, end - start + 1), status=206,
+            content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+
+    return response
+
+
+def proxy_response(name, path, content_type):
+    """
+    :return an empty response telling the front proxy which file to
+    send. nginx takes an internal URI, Apache and lighttpd a file path.
+    """
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = \
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+    else:
+        response['X-Sendfile'] = path
+
+    return response
+
+
+def serve(request, field_file):
+    """
+    Serve a stored file of a recipe the user owns, answering conditional
+    requests here. With MEDIA_SENDFILE set the transfer, ranges included,
+    is left to the front proxy, otherwise the file is streamed.
+    :return the response, or None if there is no such file
+    """
+    if not field_file:
+        return None
+
+    path = field_file.path
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    content_type = mimetypes.guess_type(path)[0] or \
+        'application/octet-stream'
+    etag, last_modified = validators(stat)
+
+    response = get_conditional_response(request, etag=etag,
+                                        last_modified=last_modified)
+    if response is None:
+        if settings.MEDIA_SENDFILE:
+            response = proxy_response(field_file.name, path, content_type)
+        else:
+            response = file_response(request, path, stat, content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+
+    return response
@@ -0,0 +1,30 @@
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """
+    Keyset pagination for recipes, newest first. Search results are
+    paged by relevance instead.
+    """
+
+    ordering = ("-id", )
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        """Order by rank when the queryset is a ranked search"""
+        if "rank" in queryset.query.annotations:
+            return ("-rank", "-id")
+
+        return super().get_ordering(request, queryset, view)
+
+
+class NameCursorPagination(CursorPagination):
+    """
+    Keyset pagination for tags and ingredients, sorted by name.
+    The id tie-breaker keeps the order stable for duplicate names.
+    """
+
+    ordering = ("-name", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 500
@@ -0,0 +1,90 @@
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class UserOwnedManyRelatedField(serializers.ManyRelatedField):
+    """
+    Resolve every submitted primary key with one query, reporting all
+    unknown ones, or ones owned by another user, in a single error
+    """
+
+    default_error_messages = {
+        'does_not_exist': _('Invalid pks {pk_values} - objects do not '
+                            'exist.'),
+    }
+
+    # objects of a whole batch by pk, loaded by resolve_batch
+    resolved = None
+
+    def to_pks(self, data):
+        """:return the submitted primary keys, converted for lookups"""
+        child = self.child_relation
+        pk_field = child.get_queryset().model._meta.pk
+        pks = []
+        for item in data:
+            if child.pk_field is not None:
+                item = child.pk_field.to_internal_value(item)
+            try:
+                pks.append(pk_field.get_prep_value(item))
+            except (TypeError, ValueError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+
+        return pks
+
+    def resolve_batch(self, values):
+        """
+        Load the objects named by every value of a batch with one query,
+        for to_internal_value to use instead of a query per item. Values
+        that are not valid lists are left for it to reject.
+        """
+        pks = set()
+        for data in values:
+            if isinstance(data, str) or not hasattr(data, '__iter__'):
+                continue
+            try:
+                pks.update(self.to_pks(data))
+            except serializers.ValidationError:
+                continue
+
+        self.resolved = self.child_relation.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        """:return the related objects in submitted order"""
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        pks = self.to_pks(data)
+        found = self.resolved
+        if found is None:
+            found = self.child_relation.get_queryset().in_bulk(set(pks))
+        missing = [pk for pk in dict.fromkeys(pks) if pk not in found]
+        if missing:
+            self.fail('does_not_exist', pk_values=missing)
+
+        return [found[pk] for pk in pks]
+
+
+class UserOwnedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key relation limited to objects of the requesting user"""
+
+    def get_queryset(self):
+        """:return the queryset filtered to the request user, or empty"""
+        queryset = super().get_queryset()
+        request = self.context.get('request')
+        if request is None or not request.user.is_authenticated:
+            return queryset.none()
+
+        return queryset.filter(user=request.user)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """Create the batched UserOwnedManyRelatedField for many=True"""
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+
+        return UserOwnedManyRelatedField(**list_kwargs)
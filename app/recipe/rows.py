@@ -0,0 +1,113 @@
+from collections import OrderedDict
+
+from rest_framework import serializers
+
+from core.models import Recipe
+from recipe import media
+from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
+
+
+LIST_FIELDS = ('id', 'title', 'time_minutes', 'price', 'link')
+
+DETAIL_FIELDS = LIST_FIELDS + ('image', 'image_status', 'thumbnail')
+
+RELATED_FIELDS = ('ingredients', 'tag')
+
+FILE_FIELDS = ('image', 'thumbnail')
+
+_price = Recipe._meta.get_field('price')
+
+PRICE_FIELD = serializers.DecimalField(
+    max_digits=_price.max_digits, decimal_places=_price.decimal_places)
+
+
+def values(queryset, fields, ordering=()):
+    """
+    :return values() queryset of the fields, updated_at for the
+    validators and any annotation the pagination orders by
+    """
+    extra = [name.lstrip('-') for name in ordering
+             if name.lstrip('-') in queryset.query.annotations]
+
+    return queryset.values(*fields, 'updated_at', *extra)
+
+
+def related_ids(field, recipe_ids):
+    """:return {recipe_id: [related ids]} from the through table alone"""
+    column = f'{field}_id'
+    grouped = {}
+    rows = getattr(Recipe, field).through.objects.\
+        filter(recipe_id__in=recipe_ids).\
+        order_by('recipe_id', column).\
+        values_list('recipe_id', column)
+
+    for recipe_id, related_id in rows:
+        grouped.setdefault(recipe_id, []).append(related_id)
+
+    return grouped
+
+
+def related_objects(field, recipe_ids):
+    """:return {recipe_id: [{"id", "name"}]} of the related objects"""
+    column = f'{field}_id'
+    grouped = {}
+    rows = getattr(Recipe, field).through.objects.\
+        filter(recipe_id__in=recipe_ids).\
+        order_by('recipe_id', column).\
+        values_list('recipe_id', column, f'{field}__name')
+
+    for recipe_id, related_id, name in rows:
+        grouped.setdefault(recipe_id, []).append(
+            OrderedDict((('id', related_id), ('name', name))))
+
+    return grouped
+
+
+def columns(fields, selected=None):
+    """
+    :return the columns of `fields` needed to render the selected fields,
+    always with id, which keys the related lookups
+    """
+    if selected is None:
+        return fields
+
+    return tuple(name for name in fields if name == 'id' or name in selected)
+
+
+def render(rows, request=None, detail=False, fields=None, expand=()):
+    """
+    Build the RecipeSerializer, or with detail the RecipeDetailSerializer,
+    representation of values() rows without creating model instances.
+    Related objects are loaded with one query per relation and ordered
+    by id. With `fields`, only those fields are rendered and relations
+    left out are not queried. Relations in `expand` are rendered as the
+    detail serializer nests them.
+    """
+    serializer = RecipeDetailSerializer if detail else RecipeSerializer
+    names = [name for name in serializer.Meta.fields
+             if fields is None or name in fields]
+
+    recipe_ids = [row['id'] for row in rows]
+    related = {}
+    for field in RELATED_FIELDS:
+        if field in names:
+            load = related_objects if detail or field in expand \
+                else related_ids
+            related[field] = load(field, recipe_ids)
+
+    data = []
+    for row in rows:
+        item = OrderedDict()
+        for name in names:
+            if name in related:
+                item[name] = related[name].get(row['id'], [])
+            elif name == 'price':
+                item[name] = PRICE_FIELD.to_representation(row[name])
+            elif name in FILE_FIELDS:
+                item[name] = media.file_url(name, row['id'], request) \
+                    if row[name] else None
+            else:
+                item[name] = row[name]
+        data.append(item)
+
+    return data
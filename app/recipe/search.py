@@ -0,0 +1,45 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, \
+    SearchVector, TrigramSimilarity
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast
+
+
+SEARCH_CONFIG = 'english'
+
+_trigram_available = {}
+
+
+def has_trigram(connection):
+    """:return True when the pg_trgm extension is installed"""
+    if connection.alias not in _trigram_available:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[connection.alias] = \
+                cursor.fetchone() is not None
+
+    return _trigram_available[connection.alias]
+
+
+def search_recipes(queryset, term, connection):
+    """
+    Filter recipes by title and annotate each match with a `rank`.
+    PostgreSQL matches through the full-text and trigram indexes from
+    core migration 0007; other databases fall back to icontains.
+    """
+    if connection.vendor != 'postgresql':
+        return queryset.filter(title__icontains=term)
+
+    vector = SearchVector('title', config=SEARCH_CONFIG)
+    query = SearchQuery(term, config=SEARCH_CONFIG)
+    queryset = queryset.annotate(title_vector=vector)
+    match = Q(title_vector=query)
+    rank = SearchRank(vector, query)
+
+    if has_trigram(connection):
+        match |= Q(title__trigram_similar=term)
+        rank = rank + TrigramSimilarity('title', term)
+
+    # ts_rank is real; as double precision the rank a pagination cursor
+    # stores as text compares equal to the row it came from
+    return queryset.filter(match).annotate(rank=Cast(rank, FloatField()))
@@ -1,33 +1,217 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.db import connection, models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from core.models import Tag, Ingredients, Recipe
+from core.timing import TimedDataMixin
+from recipe import media
+from recipe.relations import UserOwnedManyRelatedField, \
+    UserOwnedPrimaryKeyRelatedField
+
+
+MAX_BULK_CREATE = 1000
+
+MAX_BATCH_RETRIEVE = 100
+
+
+class BulkCreateListSerializer(TimedDataMixin, serializers.ListSerializer):
+    """
+    List serializer that validates a batch of items and inserts them
+    with a single bulk_create
+    """
+
+    def to_internal_value(self, data):
+        """Reject oversized batches before validating any item"""
+        if isinstance(data, list) and len(data) > MAX_BULK_CREATE:
+            msg = _("Batch may not contain more than {max_items} items").\
+                format(max_items=MAX_BULK_CREATE)
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [msg]}, code="max_length")
+
+        if isinstance(data, list):
+            self.prepare_batch(data)
+
+        return super().to_internal_value(data)
+
+    def prepare_batch(self, data):
+        """Hook run on a batch before its items are validated"""
+
+    def bulk_insert(self, objs):
+        """
+        Insert the unsaved model instances and return them with their
+        primary keys set
+        """
+        if connection.features.can_return_ids_from_bulk_insert:
+            return self.child.Meta.model.objects.bulk_create(objs)
+
+        for obj in objs:
+            obj.save(force_insert=True)
+
+        return objs
+
+    def create(self, validated_data):
+        """Create all items in one insert"""
+        model = self.child.Meta.model
+
+        return self.bulk_insert([model(**attrs) for attrs in validated_data])
+
+
+class RecipeListSerializer(BulkCreateListSerializer):
+    """Bulk create recipes along with their tag and ingredient links"""
+
+    def prepare_batch(self, data):
+        """
+        Resolve the tags and ingredients of every recipe with one query
+        per relation, rather than two queries per recipe
+        """
+        for name in ("tag", "ingredients"):
+            field = self.child.fields.get(name)
+            if isinstance(field, UserOwnedManyRelatedField):
+                field.resolve_batch(item.get(name) for item in data
+                                    if isinstance(item, Mapping))
+
+    def create(self, validated_data):
+        """
+        Insert recipes, then the through rows for every recipe's tags and
+        ingredients in one insert per relation
+        """
+        links = [(attrs.pop("tag", []), attrs.pop("ingredients", []))
+                 for attrs in validated_data]
+        recipes = super().create(validated_data)
+
+        tag_rows = []
+        ingredient_rows = []
+        for recipe, (tags, ingredients) in zip(recipes, links):
+            # repeated ids are linked once, as set() does for one recipe
+            tag_rows.extend(
+                Recipe.tag.through(recipe_id=recipe.id, tag_id=tag_id)
+                for tag_id in dict.fromkeys(tag.id for tag in tags))
+            ingredient_rows.extend(
+                Recipe.ingredients.through(recipe_id=recipe.id,
+                                           ingredients_id=ingredient_id)
+                for ingredient_id in dict.fromkeys(
+                    ingredient.id for ingredient in ingredients))
+
+        Recipe.tag.through.objects.bulk_create(tag_rows)
+        Recipe.ingredients.through.objects.bulk_create(ingredient_rows)
+
+        # links written in bulk send no m2m_changed, bump the linked tags
+        # and ingredients here since their recipe_count changed
+        now = timezone.now()
+        Tag.objects.filter(pk__in={row.tag_id for row in tag_rows}).\
+            update(updated_at=now)
+        Ingredients.objects.\
+            filter(pk__in={row.ingredients_id for row in ingredient_rows}).\
+            update(updated_at=now)
+
+        created = Recipe.objects.\
+            filter(id__in=[recipe.id for recipe in recipes]).\
+            prefetch_related("tag", "ingredients").in_bulk()
+
+        return [created[recipe.id] for recipe in recipes]
+
+
+class SparseFieldsMixin(serializers.Serializer):
+    """
+    Keep only the fields named in the `fields` context entry, as chosen
+    by ?fields= and ?exclude=
+    """
+
+    def get_fields(self):
+        """:return the declared fields limited to the selection"""
+        fields = super().get_fields()
+        selected = self.context.get("fields")
+        if selected is None:
+            return fields
+
+        return OrderedDict((name, field) for name, field in fields.items()
+                           if name in selected)
+
+
+class RecipeCountMixin(serializers.Serializer):
+    """
+    Add the `recipe_count` annotated by recipe.filters.with_recipe_count.
+    Objects just created have no recipes yet.
+    """
+    recipe_count = serializers.SerializerMethodField()
+
+    def get_recipe_count(self, obj):
+        """:return the annotated count, 0 for new objects"""
+        return getattr(obj, "recipe_count", 0)
+
+
+class NestedTagSerializer(serializers.ModelSerializer):
+    """Tag as nested in a recipe"""
+
+    class Meta:
+        model = Tag
+        fields = ("id", "name",)
+        read_only_fields = ("id",)
+
+
+class NestedIngredientSerializer(serializers.ModelSerializer):
+    """Ingredient as nested in a recipe"""
+
+    class Meta:
+        model = Ingredients
+        fields = ("id", "name",)
+        read_only_fields = ("id",)
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedDataMixin, SparseFieldsMixin, RecipeCountMixin,
+                    serializers.ModelSerializer):
     """Model Serializer class for Tag"""
 
     class Meta:
         model = Tag
-        fields = ("id", "name",)
+        fields = ("id", "name", "recipe_count",)
         read_only_fields = ("id",)
+        list_serializer_class = BulkCreateListSerializer
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedDataMixin, SparseFieldsMixin,
+                           RecipeCountMixin, serializers.ModelSerializer):
     """Model Serializer class for Ingredient"""
 
     class Meta:
         model = Ingredients
-        fields = ("id", "name",)
+        fields = ("id", "name", "recipe_count",)
         read_only_fields = ("id",)
+        list_serializer_class = BulkCreateListSerializer
+
+
+class RecipeMediaField(serializers.ImageField):
+    """
+    Recipe image rendered as the URL of the view serving it to the owner,
+    rather than a public MEDIA_URL path
+    """
+
+    def to_representation(self, value):
+        """:return the media view URL, or None without a file"""
+        if not value:
+            return None
 
+        return media.file_url(self.field_name, value.instance.pk,
+                              self.context.get("request"))
 
-class RecipeSerializer(serializers.ModelSerializer):
+
+MEDIA_FIELD_MAPPING = {**serializers.ModelSerializer.serializer_field_mapping,
+                       models.ImageField: RecipeMediaField}
+
+
+class RecipeSerializer(TimedDataMixin, serializers.ModelSerializer):
     """Serializer a recipe"""
-    ingredients = serializers.PrimaryKeyRelatedField(
+    serializer_field_mapping = MEDIA_FIELD_MAPPING
+    ingredients = UserOwnedPrimaryKeyRelatedField(
         many=True, queryset=Ingredients.objects.all())
 
-    tag = serializers.PrimaryKeyRelatedField(many=True,
-                                             queryset=Tag.objects.all())
+    tag = UserOwnedPrimaryKeyRelatedField(many=True,
+                                          queryset=Tag.objects.all())
 
     class Meta:
         model = Recipe
@@ -35,17 +219,31 @@ class RecipeSerializer(serializers.ModelSerializer):
                   'price', 'link')
 
         read_only = ('id', )
+        list_serializer_class = RecipeListSerializer
 
 
 class RecipeDetailSerializer(RecipeSerializer):
-    ingredients = IngredientSerializer(many=True, read_only=True)
-    tag = TagSerializer(many=True, read_only=True)
+    ingredients = NestedIngredientSerializer(many=True, read_only=True)
+    tag = NestedTagSerializer(many=True, read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ('image', 'image_status',
+                                                 'thumbnail')
+        read_only_fields = ('image', 'image_status', 'thumbnail')
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    """Ids of recipes to retrieve at once, in the order to return them"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False,
+        max_length=MAX_BATCH_RETRIEVE)
 
 
-class RecipeImageSerialzer(serializers.ModelSerializer):
+class RecipeImageSerialzer(TimedDataMixin, serializers.ModelSerializer):
     """Image upload for recipe"""
+    serializer_field_mapping = MEDIA_FIELD_MAPPING
 
     class Meta:
         model = Recipe
-        fields = ('id', 'image')
-        read_only_field, = ('id', )
+        fields = ('id', 'image', 'image_status', 'thumbnail')
+        read_only_fields = ('id', 'image_status', 'thumbnail')
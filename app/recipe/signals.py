@@ -0,0 +1,108 @@
+from django.db.models.signals import m2m_changed, post_delete, \
+    post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Tag, Ingredients, Recipe
+from recipe import cache
+
+
+def touch(queryset):
+    """Bump updated_at of every object in queryset"""
+
+    queryset.update(updated_at=timezone.now())
+
+
+def touch_instance(instance):
+    """Bump updated_at of instance, keeping the in-memory copy in sync"""
+
+    instance.updated_at = timezone.now()
+    type(instance).objects.filter(pk=instance.pk).\
+        update(updated_at=instance.updated_at)
+
+
+def recipe_field(model):
+    """:return name of the Recipe field linking to model"""
+
+    return "tag" if model is Tag else "ingredients"
+
+
+@receiver(m2m_changed, sender=Recipe.tag.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_assigned_lists(sender, instance, action, model, pk_set,
+                              **kwargs):
+    """
+    Bump both sides of changed recipe links and drop cached
+    tag/ingredient lists
+    """
+
+    if action == 'pre_clear':
+        if isinstance(instance, Recipe):
+            touch(model.objects.filter(recipe=instance))
+        else:
+            touch(Recipe.objects.filter(
+                **{recipe_field(type(instance)): instance}))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    touch_instance(instance)
+    if pk_set:
+        touch(model.objects.filter(pk__in=pk_set))
+
+    attr_model = type(instance) if model is Recipe else model
+    cache.invalidate(Recipe, instance.user_id)
+    cache.invalidate(attr_model, instance.user_id)
+
+
+@receiver(post_save, sender=Recipe)
+def invalidate_changed_recipe_lists(sender, instance, **kwargs):
+    """Saved recipes may join or leave filtered and searched lists"""
+
+    cache.invalidate(Recipe, instance.user_id)
+
+
+@receiver(pre_delete, sender=Recipe)
+def touch_recipe_attrs(sender, instance, **kwargs):
+    """Tags and ingredients of a deleted recipe lose one recipe_count"""
+
+    touch(Tag.objects.filter(recipe=instance))
+    touch(Ingredients.objects.filter(recipe=instance))
+
+
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_lists(sender, instance, **kwargs):
+    """Deleting a recipe drops its through rows without m2m_changed"""
+
+    cache.invalidate(Recipe, instance.user_id)
+    cache.invalidate(Tag, instance.user_id)
+    cache.invalidate(Ingredients, instance.user_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredients)
+def touch_attr_recipes(sender, instance, created, **kwargs):
+    """Recipes nesting a renamed tag or ingredient change with it"""
+
+    if not created:
+        touch(Recipe.objects.filter(**{recipe_field(sender): instance}))
+
+    cache.invalidate(sender, instance.user_id)
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredients)
+def touch_unlinked_recipes(sender, instance, **kwargs):
+    """Recipes lose the links of a deleted tag or ingredient"""
+
+    touch(Recipe.objects.filter(**{recipe_field(sender): instance}))
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredients)
+def invalidate_attr_lists(sender, instance, **kwargs):
+    """Drop cached lists when a tag or ingredient is deleted"""
+
+    cache.invalidate(Recipe, instance.user_id)
+    cache.invalidate(sender, instance.user_id)
@@ -0,0 +1,58 @@
+from rest_framework.exceptions import ValidationError
+
+
+def _names(query_params, param):
+    """:return the comma separated names of a query parameter, or None"""
+    value = query_params.get(param)
+    if value is None:
+        return None
+
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def selected_fields(query_params, available):
+    """
+    :return the names of `available` kept by ?fields= and ?exclude=, in
+    their declared order, or None when neither parameter is given
+    """
+    fields = _names(query_params, "fields")
+    exclude = _names(query_params, "exclude")
+    if fields is None and exclude is None:
+        return None
+
+    errors = {}
+    for param, names in (("fields", fields), ("exclude", exclude)):
+        unknown = [name for name in names or () if name not in available]
+        if unknown:
+            errors[param] = [f"Unknown fields: {', '.join(unknown)}"]
+    if errors:
+        raise ValidationError(errors)
+
+    return tuple(name for name in available
+                 if (fields is None or name in fields) and
+                 name not in (exclude or ()))
+
+
+def expanded(query_params, available):
+    """
+    :return the relations of `available` named by ?expand=, to render as
+    nested objects instead of ids
+    """
+    names = _names(query_params, "expand") or []
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValidationError(
+            {"expand": [f"Unknown relations: {', '.join(unknown)}"]})
+
+    return tuple(name for name in available if name in names)
+
+
+def model_columns(model, selected, required=()):
+    """
+    :return concrete model fields among `selected` for only(), plus the
+    `required` ones the view reads itself
+    """
+    concrete = {field.name for field in model._meta.concrete_fields}
+
+    return [name for name in dict.fromkeys((*required, *selected))
+            if name in concrete]
@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+from recipe.serializers import MAX_BATCH_RETRIEVE
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+BATCH_URL = reverse('recipe:recipe-batch')
+
+
+def sample_recipe(user, title="Sample recipe"):
+    """Create and return a sample recipe"""
+
+    return Recipe.objects.create(user=user, title=title, time_minutes=10,
+                                 price=5.00)
+
+
+class BatchRetrieveTests(TestCase):
+    """Test retrieving many recipes by id in one request"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "batch@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name="Vegan")
+        self.recipes = [sample_recipe(self.user, title=f"Recipe {n}")
+                        for n in range(3)]
+        for recipe in self.recipes:
+            recipe.tag.add(self.tag)
+
+    def test_query_ids_in_order(self):
+        """Test ?ids= returns detail data in the requested order"""
+
+        first, second, third = self.recipes
+        detail = self.client.get(
+            reverse("recipe:recipe-detail", args=[second.id]))
+
+        res = self.client.get(RECIPES_URL, {
+            "ids": f"{third.id},{second.id},{first.id}"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in res.data["results"]],
+                         [third.id, second.id, first.id])
+        self.assertEqual(res.data["results"][1], detail.data)
+        self.assertEqual(res.data["missing"], [])
+
+    def test_post_reports_missing(self):
+        """Test unknown ids and other users' recipes are listed missing"""
+
+        other = get_user_model().objects.create_user(
+            "other-batch@gmail.com", "password123")
+        foreign = sample_recipe(other)
+        own = self.recipes[0]
+
+        res = self.client.post(BATCH_URL, {
+            "ids": [9999, own.id, foreign.id, own.id]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in res.data["results"]],
+                         [own.id])
+        self.assertEqual(res.data["missing"], [9999, foreign.id])
+
+    def test_query_count_fixed(self):
+        """Test the recipes and both relations load in three queries"""
+
+        ids = [recipe.id for recipe in self.recipes]
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(BATCH_URL, {"ids": ids}, format="json")
+        many = [query for query in ctx.captured_queries
+                if "core_recipe" in query["sql"]]
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(BATCH_URL, {"ids": ids[:1]}, format="json")
+        one = [query for query in ctx.captured_queries
+               if "core_recipe" in query["sql"]]
+
+        self.assertEqual(len(many), 3)
+        self.assertEqual(len(one), 3)
+
+    def test_batch_size_capped(self):
+        """Test more than MAX_BATCH_RETRIEVE ids are rejected"""
+
+        ids = list(range(1, MAX_BATCH_RETRIEVE + 2))
+
+        res = self.client.post(BATCH_URL, {"ids": ids}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ids", res.data)
+
+    def test_invalid_ids(self):
+        """Test malformed and empty id lists are rejected"""
+
+        res = self.client.get(RECIPES_URL, {"ids": "1,two"})
+        empty = self.client.post(BATCH_URL, {"ids": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(empty.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,208 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+from recipe import serializers
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredients-list')
+
+
+class BulkCreateTests(TestCase):
+    """Test creating several objects with one POST"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "bulk_create@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_tags(self):
+        """Test a JSON array creates every tag for the user"""
+
+        payload = [{"name": "Vegan"}, {"name": "Lunch"}, {"name": "Spicy"}]
+
+        res = self.client.post(TAGS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item["name"] for item in res.data],
+                         ["Vegan", "Lunch", "Spicy"])
+        tags = Tag.objects.filter(user=self.user)
+        self.assertEqual(tags.count(), 3)
+        self.assertEqual(sorted(item["id"] for item in res.data),
+                         sorted(tag.id for tag in tags))
+
+    def test_bulk_create_ingredients_invalidates_list(self):
+        """Test bulk created ingredients show up in the cached list"""
+
+        self.client.get(INGREDIENTS_URL)
+
+        self.client.post(INGREDIENTS_URL, [{"name": "Salt"}], format="json")
+        res = self.client.get(INGREDIENTS_URL)
+
+        self.assertEqual(res.data["results"][0]["name"], "Salt")
+
+    def test_single_create_unchanged(self):
+        """Test posting one object still returns one object"""
+
+        res = self.client.post(TAGS_URL, {"name": "Vegan"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["name"], "Vegan")
+
+    def test_bulk_create_per_item_errors(self):
+        """Test invalid items are reported by position and nothing saved"""
+
+        payload = [{"name": "Vegan"}, {"name": ""}, {"name": "Lunch"}]
+
+        res = self.client.post(TAGS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data), 3)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("name", res.data[1])
+        self.assertEqual(res.data[2], {})
+        self.assertFalse(Tag.objects.exists())
+
+    def test_bulk_create_batch_limit(self):
+        """Test batches above the cap are rejected"""
+
+        payload = [{"name": "Tag"}] * 3
+
+        with patch.object(serializers, "MAX_BULK_CREATE", 2):
+            res = self.client.post(TAGS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tag.objects.exists())
+
+    def test_bulk_create_recipes_with_links(self):
+        """Test recipes and their tag/ingredient links are created"""
+
+        tag1 = Tag.objects.create(user=self.user, name="Vegan")
+        tag2 = Tag.objects.create(user=self.user, name="Lunch")
+        salt = Ingredients.objects.create(user=self.user, name="Salt")
+        payload = [
+            {"title": "Salad", "time_minutes": 5, "price": "3.00",
+             "tag": [tag1.id, tag2.id], "ingredients": [salt.id]},
+            {"title": "Soup", "time_minutes": 20, "price": "4.50",
+             "tag": [tag2.id], "ingredients": []},
+        ]
+
+        res = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item["title"] for item in res.data],
+                         ["Salad", "Soup"])
+        salad = Recipe.objects.get(user=self.user, title="Salad")
+        soup = Recipe.objects.get(user=self.user, title="Soup")
+        self.assertEqual(set(salad.tag.all()), {tag1, tag2})
+        self.assertEqual(list(salad.ingredients.all()), [salt])
+        self.assertEqual(list(soup.tag.all()), [tag2])
+        self.assertEqual(sorted(res.data[0]["tag"]),
+                         sorted([tag1.id, tag2.id]))
+
+    def test_bulk_create_recipes_repeated_ids(self):
+        """Test ids repeated within a recipe are linked once"""
+
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        salt = Ingredients.objects.create(user=self.user, name="Salt")
+        payload = [{"title": "Salad", "time_minutes": 5, "price": "3.00",
+                    "tag": [tag.id, tag.id],
+                    "ingredients": [salt.id, salt.id]}]
+
+        res = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data[0]["tag"], [tag.id])
+        self.assertEqual(res.data[0]["ingredients"], [salt.id])
+
+    def test_bulk_create_recipes_single_insert(self):
+        """Test a batch writes recipes and links with one INSERT each"""
+
+        if not connection.features.can_return_ids_from_bulk_insert:
+            self.skipTest("database cannot return ids from bulk insert")
+
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        salt = Ingredients.objects.create(user=self.user, name="Salt")
+        payload = [{"title": f"Recipe {n}", "time_minutes": 5,
+                    "price": "3.00", "tag": [tag.id],
+                    "ingredients": [salt.id]}
+                   for n in range(10)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        inserts = [query for query in ctx.captured_queries
+                   if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 3)
+
+    def test_bulk_create_recipes_resolves_links_once(self):
+        """Test tags and ingredients of a batch load in one query each"""
+
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        salt = Ingredients.objects.create(user=self.user, name="Salt")
+
+        def lookups(size):
+            payload = [{"title": f"Recipe {n}", "time_minutes": 5,
+                        "price": "3.00", "tag": [tag.id],
+                        "ingredients": [salt.id]}
+                       for n in range(size)]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(RECIPES_URL, payload, format="json")
+
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            # the links of the created recipes are prefetched afterwards
+            return [query for query in ctx.captured_queries
+                    if query["sql"].startswith("SELECT") and
+                    "_prefetch_related_val" not in query["sql"] and
+                    ('FROM "core_tag"' in query["sql"] or
+                     'FROM "core_ingredients"' in query["sql"])]
+
+        self.assertEqual(len(lookups(1)), 2)
+        self.assertEqual(len(lookups(10)), 2)
+
+    def test_bulk_create_recipes_foreign_links(self):
+        """Test another user's tag is reported on the item using it"""
+
+        other = get_user_model().objects.create_user(
+            "bulk_other@gmail.com", "password123")
+        own = Tag.objects.create(user=self.user, name="Vegan")
+        foreign = Tag.objects.create(user=other, name="Lunch")
+        payload = [{"title": "Salad", "time_minutes": 5, "price": "3.00",
+                    "tag": [own.id], "ingredients": []},
+                   {"title": "Soup", "time_minutes": 20, "price": "4.50",
+                    "tag": [own.id, foreign.id], "ingredients": []}]
+
+        res = self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn(str(foreign.id), str(res.data[1]["tag"]))
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_recipes_rolls_back(self):
+        """Test a failure while writing links rolls back the recipes"""
+
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        payload = [{"title": "Salad", "time_minutes": 5, "price": "3.00",
+                    "tag": [tag.id], "ingredients": []}]
+
+        with patch.object(Recipe.tag.through.objects, "bulk_create",
+                          side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.client.post(RECIPES_URL, payload, format="json")
+
+        self.assertFalse(Recipe.objects.exists())
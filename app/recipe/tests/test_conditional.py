@@ -0,0 +1,228 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def detail_url(recipe_id):
+    """:return recipe detail url"""
+
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def sample_recipe(user, title="Sample recipe"):
+    """Create and return a sample recipe"""
+
+    return Recipe.objects.create(user=user, title=title,
+                                 time_minutes=10, price=5.00)
+
+
+class ConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified validators on recipe resources"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "conditional@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        self.recipe = sample_recipe(self.user)
+
+    def test_list_validators(self):
+        """Test lists carry validators and must be revalidated"""
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", res)
+        self.assertIn("private", res["Cache-Control"])
+        self.assertIn("no-cache", res["Cache-Control"])
+
+    def test_list_not_modified(self):
+        """Test a matching If-None-Match skips serializing the page"""
+
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        self.assertEqual(res.content, b"")
+
+    def test_list_etag_per_query(self):
+        """Test each page and filter has its own ETag"""
+
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        other = self.client.get(RECIPES_URL, {"page_size": 1})["ETag"]
+
+        self.assertNotEqual(etag, other)
+
+    def test_list_etag_changes_on_link_change(self):
+        """Test linking a tag changes the list ETag"""
+
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        self.recipe.tag.add(Tag.objects.create(user=self.user, name="Vegan"))
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_list_etag_changes_on_delete(self):
+        """Test deleting a recipe changes the list ETag"""
+
+        sample_recipe(self.user, "Second")
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        self.recipe.delete()
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_if_modified_since(self):
+        """Test If-Modified-Since compares with Last-Modified"""
+
+        last_modified = self.client.get(RECIPES_URL)["Last-Modified"]
+
+        res = self.client.get(RECIPES_URL,
+                              HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        res = self.client.get(RECIPES_URL,
+                              HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_per_user(self):
+        """Test another user's list never matches"""
+
+        etag = self.client.get(RECIPES_URL)["ETag"]
+        other = get_user_model().objects.create_user(
+            "other@gmail.com", "password123")
+        self.client.force_authenticate(other)
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_not_modified(self):
+        """Test a matching If-None-Match skips fetching related objects"""
+
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(detail_url(self.recipe.id),
+                                  HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_changes_on_tag_rename(self):
+        """Test renaming a nested tag changes the recipe ETag"""
+
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        self.recipe.tag.add(tag)
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+        tag.name = "Vegetarian"
+        tag.save()
+
+        res = self.client.get(detail_url(self.recipe.id),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["tag"][0]["name"], "Vegetarian")
+
+    def test_tag_list_not_modified(self):
+        """Test a cached tag list answers 304 without queries"""
+
+        Tag.objects.create(user=self.user, name="Vegan")
+        etag = self.client.get(TAGS_URL)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_assigned_tag_list_changes_on_unlink(self):
+        """Test assigned_only lists change when a tag is unlinked"""
+
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        self.recipe.tag.add(tag)
+        params = {"assigned_only": 1}
+        etag = self.client.get(TAGS_URL, params)["ETag"]
+        self.recipe.tag.remove(tag)
+
+        res = self.client.get(TAGS_URL, params, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [])
+
+
+class ConditionalUpdateTests(TestCase):
+    """Test If-Match on recipe updates"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "if_match@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        self.recipe = sample_recipe(self.user)
+        self.url = detail_url(self.recipe.id)
+
+    def test_patch_with_current_etag(self):
+        """Test an update with the current ETag succeeds"""
+
+        etag = self.client.get(self.url)["ETag"]
+
+        res = self.client.patch(self.url, {"title": "New title"},
+                                HTTP_IF_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res["ETag"], self.client.get(self.url)["ETag"])
+
+    def test_patch_with_stale_etag(self):
+        """Test an update based on an older version is rejected"""
+
+        etag = self.client.get(self.url)["ETag"]
+        self.client.patch(self.url, {"title": "First edit"})
+
+        res = self.client.patch(self.url, {"title": "Second edit"},
+                                HTTP_IF_MATCH=etag)
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, "First edit")
+
+    def test_put_with_stale_etag_after_link_change(self):
+        """Test linking a tag invalidates the ETag used by If-Match"""
+
+        etag = self.client.get(self.url)["ETag"]
+        self.recipe.tag.add(Tag.objects.create(user=self.user, name="Vegan"))
+        payload = {"title": "Replaced", "time_minutes": 5, "price": 1.00,
+                   "tag": [], "ingredients": []}
+
+        res = self.client.put(self.url, payload, HTTP_IF_MATCH=etag)
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_update_if_match_missing_recipe(self):
+        """Test If-Match on a missing recipe is a 404"""
+
+        res = self.client.patch(detail_url(self.recipe.id + 1),
+                                {"title": "x"}, HTTP_IF_MATCH='"abc"')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
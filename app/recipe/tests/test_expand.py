@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class ExpandTests(TestCase):
+    """Test ?expand= nests tags and ingredients on the recipe list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "expand@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        self.tags = [Tag.objects.create(user=self.user, name=f"Tag {n}")
+                     for n in range(2)]
+        self.salt = Ingredients.objects.create(user=self.user, name="Salt")
+
+    def sample_recipe(self, title="Curry"):
+        """Create a recipe with both tags and salt"""
+
+        recipe = Recipe.objects.create(user=self.user, title=title,
+                                       time_minutes=30, price=12.5)
+        recipe.tag.add(*self.tags)
+        recipe.ingredients.add(self.salt)
+
+        return recipe
+
+    def count_queries(self, params):
+        """:return number of queries listing recipes with params runs"""
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_expand_nests_objects(self):
+        """Test expanded relations match the detail representation"""
+
+        recipe = self.sample_recipe()
+
+        res = self.client.get(RECIPES_URL, {"expand": "tag,ingredients"})
+        detail = self.client.get(
+            reverse("recipe:recipe-detail", args=[recipe.id]))
+
+        item = res.data["results"][0]
+        self.assertEqual(item["tag"], detail.data["tag"])
+        self.assertEqual(item["ingredients"], detail.data["ingredients"])
+        self.assertEqual(item["ingredients"],
+                         [{"id": self.salt.id, "name": "Salt"}])
+
+    def test_expand_one_relation(self):
+        """Test relations not expanded stay lists of ids"""
+
+        self.sample_recipe()
+
+        res = self.client.get(RECIPES_URL, {"expand": "ingredients"})
+
+        item = res.data["results"][0]
+        self.assertEqual(item["tag"], [tag.id for tag in self.tags])
+        self.assertEqual(item["ingredients"][0]["name"], "Salt")
+
+    def test_expand_query_count_fixed(self):
+        """Test the number of queries does not grow with the page"""
+
+        self.sample_recipe()
+        params = {"expand": "tag,ingredients"}
+        one = self.count_queries(params)
+
+        for n in range(5):
+            self.sample_recipe(title=f"Recipe {n}")
+
+        self.assertEqual(self.count_queries(params), one)
+        self.assertEqual(one, self.count_queries({}))
+
+    def test_unknown_relation(self):
+        """Test expanding an unknown relation is rejected"""
+
+        res = self.client.get(RECIPES_URL, {"expand": "tag,user"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data, {"expand": ["Unknown relations: user"]})
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+
+
+EXPORT_URL = reverse('recipe:recipe-export-recipes')
+
+
+def sample_recipe(user, title="Sample recipe"):
+    """Create and return a sample recipe"""
+
+    return Recipe.objects.create(user=user, title=title,
+                                 time_minutes=10, price=5.00)
+
+
+def content(res):
+    """:return the body of a streaming response as text"""
+
+    return b''.join(res.streaming_content).decode('utf-8')
+
+
+class RecipeExportTests(TestCase):
+    """Test streaming export of a user's recipes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "export@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+        self.recipe = sample_recipe(self.user, "Dal Pitha")
+        self.recipe.tag.add(Tag.objects.create(user=self.user, name="Veg"),
+                            Tag.objects.create(user=self.user, name="Lunch"))
+        self.recipe.ingredients.add(
+            Ingredients.objects.create(user=self.user, name="Rice Flour"))
+
+    def test_login_required(self):
+        """Test export needs authentication"""
+
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_ndjson(self):
+        """Test the default export is one JSON recipe per line"""
+
+        sample_recipe(self.user, "Rasogulla")
+        other = get_user_model().objects.create_user(
+            "export_other@gmail.com", "password123")
+        sample_recipe(other, "Not mine")
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in content(res).splitlines()]
+        self.assertEqual([line["title"] for line in lines],
+                         ["Dal Pitha", "Rasogulla"])
+        self.assertEqual(lines[0]["tags"], ["Lunch", "Veg"])
+        self.assertEqual(lines[0]["ingredients"], ["Rice Flour"])
+        self.assertEqual(lines[0]["price"], "5.00")
+        self.assertEqual(lines[1]["tags"], [])
+
+    def test_export_csv(self):
+        """Test CSV export joins tag and ingredient names"""
+
+        res = self.client.get(EXPORT_URL, {"export_format": "csv"})
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(content(res))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["title"], "Dal Pitha")
+        self.assertEqual(rows[0]["tags"], "Lunch|Veg")
+        self.assertEqual(rows[0]["ingredients"], "Rice Flour")
+
+    def test_export_invalid_format(self):
+        """Test unknown export formats are rejected"""
+
+        res = self.client.get(EXPORT_URL, {"export_format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('recipe.export.EXPORT_CHUNK_SIZE', 2)
+    def test_export_queries_per_chunk(self):
+        """Test names are loaded per chunk rather than per recipe"""
+
+        for n in range(4):
+            sample_recipe(self.user, f"Recipe {n}")
+
+        res = self.client.get(EXPORT_URL)
+
+        # recipes cursor, then tags and ingredients for 3 chunks
+        with self.assertNumQueries(1 + 3 * 2):
+            lines = content(res).splitlines()
+
+        self.assertEqual(len(lines), 5)
@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def sample_recipe(user, title, tags=(), ingredients=()):
+    """Create a recipe linked to the given tags and ingredients"""
+
+    recipe = Recipe.objects.create(user=user, title=title,
+                                   time_minutes=10, price=5.00)
+    recipe.tag.add(*tags)
+    recipe.ingredients.add(*ingredients)
+
+    return recipe
+
+
+def ids(value):
+    """:return comma separated ids of model instances"""
+
+    return ",".join(str(obj.id) for obj in value)
+
+
+class RecipeFilterModeTests(TestCase):
+    """Test matching any or all of the requested tags and ingredients"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "filters@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+        self.veg, self.quick, self.spicy = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ("Veg", "Quick", "Spicy")]
+        self.rice, self.salt = [
+            Ingredients.objects.create(user=self.user, name=name)
+            for name in ("Rice", "Salt")]
+
+        self.both = sample_recipe(self.user, "Veg Pulao",
+                                  tags=(self.veg, self.quick),
+                                  ingredients=(self.rice, self.salt))
+        self.veg_only = sample_recipe(self.user, "Dal",
+                                      tags=(self.veg,),
+                                      ingredients=(self.salt,))
+        self.untagged = sample_recipe(self.user, "Toast")
+
+    def titles(self, params):
+        """:return recipe titles listed for params, duplicates kept"""
+
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe["title"] for recipe in res.data["results"]]
+
+    def test_any_returns_each_recipe_once(self):
+        """Test a recipe matching several tags is listed once"""
+
+        titles = self.titles({"tags": ids((self.veg, self.quick))})
+
+        self.assertEqual(sorted(titles), ["Dal", "Veg Pulao"])
+
+    def test_any_is_default(self):
+        """Test tags without a mode match any of them"""
+
+        self.assertEqual(
+            self.titles({"tags": ids((self.quick, self.spicy))}),
+            self.titles({"tags": ids((self.quick, self.spicy)),
+                         "tags_mode": "any"}))
+
+    def test_tags_mode_all(self):
+        """Test tags_mode=all requires every tag"""
+
+        titles = self.titles({"tags": ids((self.veg, self.quick)),
+                              "tags_mode": "all"})
+
+        self.assertEqual(titles, ["Veg Pulao"])
+
+    def test_tags_mode_all_ignores_repeated_ids(self):
+        """Test a repeated id does not make all unsatisfiable"""
+
+        titles = self.titles({"tags": f"{self.veg.id},{self.veg.id}",
+                              "tags_mode": "all"})
+
+        self.assertEqual(sorted(titles), ["Dal", "Veg Pulao"])
+
+    def test_ingredients_mode_all(self):
+        """Test ingredients_mode=all requires every ingredient"""
+
+        titles = self.titles({"ingredients": ids((self.rice, self.salt)),
+                              "ingredients_mode": "all"})
+
+        self.assertEqual(titles, ["Veg Pulao"])
+
+    def test_modes_combined(self):
+        """Test tag and ingredient filters apply together"""
+
+        titles = self.titles({"tags": ids((self.veg,)),
+                              "ingredients": ids((self.rice, self.salt)),
+                              "ingredients_mode": "any"})
+
+        self.assertEqual(sorted(titles), ["Dal", "Veg Pulao"])
+
+    def test_all_with_unknown_tag_matches_nothing(self):
+        """Test all cannot match a tag no recipe has"""
+
+        titles = self.titles({"tags": ids((self.veg, self.spicy)),
+                              "tags_mode": "all"})
+
+        self.assertEqual(titles, [])
+
+    def test_invalid_mode(self):
+        """Test an unknown mode is rejected"""
+
+        res = self.client.get(RECIPES_URL, {"tags": ids((self.veg,)),
+                                            "tags_mode": "most"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tags_mode", res.data)
@@ -0,0 +1,185 @@
+import io
+import shutil
+import struct
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from recipe import images
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_bytes(size=(40, 20), orientation=None):
+    """:return a JPEG, optionally carrying an EXIF orientation tag"""
+
+    exif = b''
+    if orientation is not None:
+        exif = (b'Exif\x00\x00MM\x00*\x00\x00\x00\x08\x00\x01' +
+                struct.pack('>HHIHH', 0x0112, 3, 1, orientation, 0) +
+                b'\x00\x00\x00\x00')
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, format='JPEG', exif=exif)
+
+    return buffer.getvalue()
+
+
+def sample_recipe(user, image=None):
+    """Create a recipe, optionally with a stored image"""
+
+    recipe = Recipe.objects.create(user=user, title="Sample recipe",
+                                   time_minutes=10, price=5.00)
+    if image is not None:
+        recipe.image.save('upload.jpg', ContentFile(image))
+
+    return recipe
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RECIPE_THUMBNAIL_SIZE=(16, 16))
+class ImageProcessingTests(TestCase):
+    """Test the off-request recipe image pipeline"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "image_processing@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    @patch('recipe.images.schedule_processing')
+    def test_upload_returns_pending(self, schedule):
+        """Test upload stores the original and queues processing"""
+
+        recipe = sample_recipe(self.user)
+        url = reverse("recipe:recipe-upload-image", args=[recipe.id])
+
+        upload = SimpleUploadedFile("photo.jpg", jpeg_bytes(),
+                                    content_type="image/jpeg")
+        res = self.client.post(url, {"image": upload}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["image_status"], Recipe.IMAGE_PENDING)
+        self.assertIsNone(res.data["thumbnail"])
+        schedule.assert_called_once()
+        self.assertEqual(schedule.call_args[0][0].pk, recipe.pk)
+
+    def test_detail_exposes_status(self):
+        """Test clients can poll the recipe for processing status"""
+
+        recipe = sample_recipe(self.user, jpeg_bytes())
+        images.process_recipe_image(recipe.id, recipe.image.name)
+
+        res = self.client.get(reverse("recipe:recipe-detail",
+                                      args=[recipe.id]))
+
+        self.assertEqual(res.data["image_status"], Recipe.IMAGE_READY)
+        self.assertTrue(res.data["thumbnail"].endswith(
+            reverse("recipe:recipe-thumbnail", args=[recipe.id])))
+
+    def test_process_normalizes_and_thumbnails(self):
+        """Test derived images are oriented, EXIF-free and resized"""
+
+        recipe = sample_recipe(self.user, jpeg_bytes(orientation=6))
+        original = recipe.image.name
+
+        images.process_recipe_image(recipe.id, original)
+        recipe.refresh_from_db()
+
+        self.assertEqual(recipe.image_status, Recipe.IMAGE_READY)
+        self.assertNotEqual(recipe.image.name, original)
+        self.assertFalse(recipe.image.storage.exists(original))
+        with Image.open(recipe.image.path) as img:
+            self.assertEqual(img.size, (20, 40))
+            self.assertNotIn('exif', img.info)
+        with Image.open(recipe.thumbnail.path) as img:
+            self.assertLessEqual(max(img.size), 16)
+
+    def test_process_skips_replaced_upload(self):
+        """Test a job for an older upload never overwrites a newer one"""
+
+        recipe = sample_recipe(self.user, jpeg_bytes())
+        stale = recipe.image.name
+        recipe.image.save('newer.jpg', ContentFile(jpeg_bytes()))
+
+        images.process_recipe_image(recipe.id, stale)
+        recipe.refresh_from_db()
+
+        self.assertEqual(recipe.image_status, Recipe.IMAGE_NONE)
+        self.assertFalse(recipe.thumbnail)
+
+    @patch('recipe.images.connection')
+    def test_failed_job_marks_recipe(self, connection):
+        """Test an undecodable upload is reported as failed"""
+
+        recipe = sample_recipe(self.user, b'not an image')
+
+        with self.assertLogs('recipe.images', 'ERROR'):
+            images.run_job(recipe.id, recipe.image.name)
+        recipe.refresh_from_db()
+
+        self.assertEqual(recipe.image_status, Recipe.IMAGE_FAILED)
+        connection.close.assert_called_once()
+
+    @patch('recipe.images.connection')
+    def test_requeue_stale_pending(self, connection):
+        """Test uploads left pending by a restart are processed again"""
+
+        stale = sample_recipe(self.user, jpeg_bytes())
+        fresh = sample_recipe(self.user, jpeg_bytes())
+        Recipe.objects.update(image_status=Recipe.IMAGE_PENDING)
+        Recipe.objects.filter(pk=stale.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=10))
+
+        out = StringIO()
+        call_command('requeue_images', older_than=300, stdout=out)
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+
+        self.assertEqual(stale.image_status, Recipe.IMAGE_READY)
+        self.assertTrue(stale.thumbnail)
+        self.assertEqual(fresh.image_status, Recipe.IMAGE_PENDING)
+        self.assertIn('Processed 1 pending images', out.getvalue())
+
+    @patch('recipe.images.connection')
+    def test_requeue_at_startup(self, connection):
+        """Test a startup run processes uploads pending for any time"""
+
+        recipe = sample_recipe(self.user, jpeg_bytes())
+        Recipe.objects.update(image_status=Recipe.IMAGE_PENDING)
+
+        out = StringIO()
+        call_command('requeue_images', older_than=0, stdout=out)
+        recipe.refresh_from_db()
+
+        self.assertEqual(recipe.image_status, Recipe.IMAGE_READY)
+        self.assertIn('Processed 1 pending images', out.getvalue())
+
+    @override_settings(RECIPE_IMAGE_WORKERS=3)
+    def test_worker_pool_bounded(self):
+        """Test the worker pool size comes from settings"""
+
+        with patch.object(images, '_executor', None):
+            executor = images.get_executor()
+            self.assertEqual(executor._max_workers, 3)
+            executor.shutdown()
@@ -0,0 +1,111 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+from recipe import filters
+
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredients-list')
+
+
+@skipUnless(connection.vendor == 'postgresql', "EXPLAIN output is PostgreSQL")
+class AccessPatternIndexTests(TestCase):
+    """Test the list and filter queries can use the composite indexes"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "indexes@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def plan(self, sql):
+        """:return the plan of raw sql with sequential and bitmap scans off"""
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+            cursor.execute(f"EXPLAIN {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def assert_uses_index(self, queryset, index_name):
+        """Test the plan for queryset mentions index_name"""
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+            plan = queryset.explain()
+
+        self.assertIn(index_name, plan)
+
+    def assert_list_uses_index(self, url, model, index_name):
+        """Test the queries a paged list request runs use index_name"""
+
+        for name in ("Salt", "Pepper", "Basil"):
+            model.objects.create(user=self.user, name=name)
+        first = self.client.get(url, {"page_size": 2})
+
+        # the first page and a page after a cursor run different queries
+        for page_url in (f"{url}?page_size=2", first.data["next"]):
+            with self.subTest(url=page_url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as ctx:
+                    res = self.client.get(page_url)
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                table = model._meta.db_table
+                queries = [query["sql"] for query in ctx.captured_queries
+                           if query["sql"].startswith("SELECT") and
+                           f'FROM "{table}"' in query["sql"]]
+                self.assertEqual(len(queries), 1)
+                self.assertIn(index_name, self.plan(queries[0]))
+
+    def test_tag_list_uses_user_name_index(self):
+        """Test the tag list filters and sorts through (user, name)"""
+
+        self.assert_list_uses_index(TAGS_URL, Tag, "core_tag_user_name_idx")
+
+    def test_ingredient_list_uses_user_name_index(self):
+        """Test the ingredient list filters and sorts through (user, name)"""
+
+        self.assert_list_uses_index(INGREDIENTS_URL, Ingredients,
+                                    "core_ingredients_user_name_idx")
+
+    def test_recipe_list_uses_user_id_index(self):
+        """Test the recipe list filters and sorts through (user, id)"""
+
+        queryset = Recipe.objects.filter(user=self.user).order_by("-id")[:101]
+
+        self.assert_uses_index(queryset, "core_recipe_user_id_idx")
+
+    def assert_filter_uses_index(self, field, index_name):
+        """Test both match modes of filters.filter_related use index_name"""
+
+        for mode in filters.MATCH_MODES:
+            with self.subTest(mode=mode):
+                queryset = filters.filter_related(
+                    Recipe.objects.filter(user=self.user), field, [1, 2],
+                    mode).order_by("-id")
+
+                self.assert_uses_index(queryset, index_name)
+
+    def test_tag_filter_uses_reverse_through_index(self):
+        """Test filtering recipes by tag reads the through table by tag"""
+
+        self.assert_filter_uses_index("tag", "core_recipe_tag_tag_recipe_idx")
+
+    def test_ingredient_filter_uses_reverse_through_index(self):
+        """Test filtering recipes by ingredient reads the through table"""
+
+        self.assert_filter_uses_index("ingredients",
+                                      "core_recipe_ingr_ingr_recipe_idx")
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.shortcuts import reverse
 from django.test import TestCase
 
@@ -7,6 +8,7 @@ from rest_framework.test import APIClient
 
 from core.models import Ingredients, Recipe
 
+from recipe.filters import with_recipe_count
 from recipe.serializers import IngredientSerializer
 
 
@@ -31,6 +33,7 @@ class PrivateIngredientsTests(TestCase):
     """Test case that for Private Ingredients """
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             email="test_ingredient@gmail.com",
@@ -49,7 +52,7 @@ class PrivateIngredientsTests(TestCase):
         serializer = IngredientSerializer(ingredients, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """Test to verify the ingredients limited to user"""
@@ -65,8 +68,8 @@ class PrivateIngredientsTests(TestCase):
         res = self.client.get(INGREDIENTS_URLS)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["name"], ing.name)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["name"], ing.name)
 
     def create_successful_ingredient(self):
         """
@@ -110,11 +113,12 @@ class PrivateIngredientsTests(TestCase):
 
         res = self.client.get(INGREDIENTS_URLS, {'assigned_only': 1})
 
-        serializer1 = IngredientSerializer(ingredients1)
-        serializer2 = IngredientSerializer(ingredients2)
+        counted = with_recipe_count(Ingredients.objects.all()).in_bulk()
+        serializer1 = IngredientSerializer(counted[ingredients1.id])
+        serializer2 = IngredientSerializer(counted[ingredients2.id])
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     def test_retrieve_ingredients_assigned_unique(self):
         """Test filtering ingredients by assigned returns unique items"""
@@ -146,4 +150,4 @@ class PrivateIngredientsTests(TestCase):
 
         res = self.client.get(INGREDIENTS_URLS, {"assigned_only": 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
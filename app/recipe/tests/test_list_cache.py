@@ -0,0 +1,248 @@
+import time
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import db_router
+from core.models import Recipe, Tag, Ingredients
+from recipe import cache
+
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredients-list')
+
+
+def sample_recipe(user):
+    """Create and return a sample recipe"""
+
+    return Recipe.objects.create(user=user, title="Sample recipe",
+                                 time_minutes=10, price=5.00)
+
+
+def names(res):
+    """:return names on a list response page"""
+
+    return [item["name"] for item in res.data["results"]]
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ListCacheTests(TestCase):
+    """Test per-user caching of tag and ingredient lists"""
+
+    def setUp(self):
+        django_cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "list_cache@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def test_repeat_list_served_from_cache(self):
+        """Test a repeated list request runs no queries"""
+
+        Tag.objects.create(user=self.user, name="Vegan")
+        first = self.client.get(TAGS_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(TAGS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+
+    def test_cache_keyed_by_assigned_only(self):
+        """Test assigned_only lists are cached separately"""
+
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        Tag.objects.create(user=self.user, name="Lunch")
+        sample_recipe(self.user).tag.add(tag)
+
+        self.assertEqual(names(self.client.get(TAGS_URL)),
+                         ["Vegan", "Lunch"])
+        res = self.client.get(TAGS_URL, {"assigned_only": 1})
+
+        self.assertEqual(names(res), ["Vegan"])
+
+    def test_cache_keyed_by_user(self):
+        """Test users never see each other's cached lists"""
+
+        other = get_user_model().objects.create_user(
+            "list_cache_other@gmail.com", "password123")
+        Tag.objects.create(user=other, name="Fruity")
+        Tag.objects.create(user=self.user, name="Dessert")
+
+        self.client.get(TAGS_URL)
+        client = APIClient()
+        client.force_authenticate(other)
+        res = client.get(TAGS_URL)
+
+        self.assertEqual(names(res), ["Fruity"])
+
+    def test_create_invalidates(self):
+        """Test creating a tag through the API shows up immediately"""
+
+        self.client.get(TAGS_URL)
+        self.client.post(TAGS_URL, {"name": "Spicy"})
+
+        self.assertEqual(names(self.client.get(TAGS_URL)), ["Spicy"])
+
+    def test_recipe_m2m_change_invalidates(self):
+        """Test adding and removing recipe links refreshes assigned lists"""
+
+        ingredient = Ingredients.objects.create(user=self.user, name="Salt")
+        recipe = sample_recipe(self.user)
+
+        res = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
+        self.assertEqual(names(res), [])
+
+        recipe.ingredients.add(ingredient)
+        res = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
+        self.assertEqual(names(res), ["Salt"])
+
+        ingredient.recipe_set.clear()
+        res = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
+        self.assertEqual(names(res), [])
+
+    def test_recipe_delete_invalidates(self):
+        """Test deleting a recipe refreshes assigned lists"""
+
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        recipe = sample_recipe(self.user)
+        recipe.tag.add(tag)
+        self.client.get(TAGS_URL, {"assigned_only": 1})
+
+        recipe.delete()
+        res = self.client.get(TAGS_URL, {"assigned_only": 1})
+
+        self.assertEqual(names(res), [])
+
+    def test_version_survives_eviction(self):
+        """Test losing the version key never revives stale entries"""
+
+        Tag.objects.create(user=self.user, name="Vegan")
+        old_version = cache.get_version(Tag, self.user.pk)
+        django_cache.delete(cache._version_key(Tag, self.user.pk))
+
+        with patch('time.time', return_value=old_version / 1000 + 1):
+            self.assertGreater(cache.get_version(Tag, self.user.pk),
+                               old_version)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class CommitInvalidationTests(TransactionTestCase):
+    """Test lists cached while a write is uncommitted are dropped"""
+
+    def setUp(self):
+        django_cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "commit_cache@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def list_key(self):
+        """:return cache key of the tag list at the current version"""
+
+        return cache.list_cache_key(Tag, self.client.get(TAGS_URL).
+                                    wsgi_request)
+
+    def test_list_read_inside_transaction(self):
+        """Test a list cached before the commit is not served after it"""
+
+        stale = django_cache.get(self.list_key())
+
+        with transaction.atomic():
+            self.client.post(TAGS_URL, {"name": "Spicy"})
+            # another connection cannot see the tag yet, stand in for its
+            # list read by caching the list as it was before the write
+            django_cache.set(self.list_key(), stale)
+            self.assertEqual(names(self.client.get(TAGS_URL)), [])
+
+        self.assertEqual(names(self.client.get(TAGS_URL)), ["Spicy"])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'])
+class ReplicaListCacheTests(TestCase):
+    """Test lists read from a lagging replica are not cached"""
+
+    def setUp(self):
+        django_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "replica_cache@gmail.com", "password123")
+        db_router.reset_writes()
+
+    def test_replica_page_after_change_not_cached(self):
+        """Test a replica read right after a change is not cached"""
+
+        cache.invalidate(Tag, self.user.pk)
+
+        with db_router.replica_reads(self.user):
+            self.assertFalse(cache.cacheable(Tag, self.user.pk))
+        self.assertTrue(cache.cacheable(Tag, self.user.pk))
+
+    def test_replica_page_cached_after_pin_window(self):
+        """Test replica reads are cached once the pin window has passed"""
+
+        django_cache.set(cache._changed_key(Tag, self.user.pk),
+                         time.time() - settings.REPLICA_PIN_SECONDS)
+
+        with db_router.replica_reads(self.user):
+            self.assertTrue(cache.cacheable(Tag, self.user.pk))
+
+
+class StampedeTests(TestCase):
+    """Test a cold key is rebuilt by a single caller"""
+
+    def setUp(self):
+        django_cache.clear()
+
+    def test_miss_builds_and_stores(self):
+        """Test a miss calls the builder once and caches the result"""
+
+        calls = []
+
+        def build():
+            calls.append(1)
+            return ["value"]
+
+        self.assertEqual(cache.get_or_build("key", build), ["value"])
+        self.assertEqual(cache.get_or_build("key", build), ["value"])
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(django_cache.get("key:lock"))
+
+    def test_miss_not_stored(self):
+        """Test store=False builds a miss without caching it"""
+
+        value = cache.get_or_build("key", lambda: ["value"], store=False)
+
+        self.assertEqual(value, ["value"])
+        self.assertIsNone(django_cache.get("key"))
+
+    def test_waits_for_lock_holder(self):
+        """Test callers wait for the rebuild in progress"""
+
+        django_cache.add("key:lock", 1)
+
+        def other_worker_finishes(seconds):
+            django_cache.set("key", ["rebuilt"])
+
+        with patch('time.sleep', side_effect=other_worker_finishes):
+            value = cache.get_or_build("key", self.fail)
+
+        self.assertEqual(value, ["rebuilt"])
+
+    @patch('time.sleep', return_value=None)
+    def test_builds_when_lock_never_released(self, sleep):
+        """Test callers give up waiting and build themselves"""
+
+        django_cache.add("key:lock", 1)
+
+        value = cache.get_or_build("key", lambda: ["fallback"])
+
+        self.assertEqual(value, ["fallback"])
+        self.assertEqual(sleep.call_count, cache.LOCK_RETRIES)
@@ -0,0 +1,182 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+CONTENT = bytes(range(256)) * 4
+
+
+def image_url(recipe_id):
+    """:return the image download url of a recipe"""
+
+    return reverse('recipe:recipe-image', args=[recipe_id])
+
+
+def sample_recipe(user, image=CONTENT):
+    """Create a recipe, optionally with a stored image"""
+
+    recipe = Recipe.objects.create(user=user, title="Sample recipe",
+                                   time_minutes=10, price=5.00)
+    if image is not None:
+        recipe.image.save('upload.jpg', ContentFile(image))
+
+    return recipe
+
+
+def body(res):
+    """:return the content of a plain or streaming response"""
+
+    if res.streaming:
+        return b''.join(res.streaming_content)
+
+    return res.content
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE='')
+class RecipeMediaTests(TestCase):
+    """Test serving recipe images to their owner"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "media@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        self.recipe = sample_recipe(self.user)
+
+    def test_login_required(self):
+        """Test anonymous users cannot download images"""
+
+        res = APIClient().get(image_url(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_detail_links_media_view(self):
+        """Test the recipe detail points at the authenticated image view"""
+
+        res = self.client.get(reverse('recipe:recipe-detail',
+                                      args=[self.recipe.id]))
+
+        self.assertEqual(res.data["image"],
+                         f"http://testserver{image_url(self.recipe.id)}")
+        self.assertIsNone(res.data["thumbnail"])
+        self.assertEqual(body(self.client.get(res.data["image"])), CONTENT)
+
+    def test_other_users_recipe_not_found(self):
+        """Test images of other users' recipes are hidden"""
+
+        other = get_user_model().objects.create_user(
+            "other-media@gmail.com", "password123")
+        recipe = sample_recipe(other)
+
+        res = self.client.get(image_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_missing_image_not_found(self):
+        """Test a recipe without an image answers 404"""
+
+        recipe = sample_recipe(self.user, image=None)
+
+        res = self.client.get(image_url(recipe.id),
+                              HTTP_ACCEPT='image/jpeg')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_whole_file(self):
+        """Test the file is streamed with its validators"""
+
+        res = self.client.get(image_url(self.recipe.id),
+                              HTTP_ACCEPT='image/jpeg')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'image/jpeg')
+        self.assertEqual(res['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', res)
+        self.assertIn('private', res['Cache-Control'])
+        self.assertEqual(body(res), CONTENT)
+
+    def test_byte_range(self):
+        """Test a single range is answered with 206 and Content-Range"""
+
+        res = self.client.get(image_url(self.recipe.id),
+                              HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(res['Content-Range'], f'bytes 10-19/{len(CONTENT)}')
+        self.assertEqual(res['Content-Length'], '10')
+        self.assertEqual(body(res), CONTENT[10:20])
+
+    def test_suffix_range(self):
+        """Test bytes=-N returns the last N bytes"""
+
+        res = self.client.get(image_url(self.recipe.id),
+                              HTTP_RANGE='bytes=-5')
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(body(res), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        """Test a range past the end answers 416"""
+
+        res = self.client.get(image_url(self.recipe.id),
+                              HTTP_RANGE=f'bytes={len(CONTENT)}-')
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(res['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_stale_if_range_gets_whole_file(self):
+        """Test a range for another version of the file is ignored"""
+
+        res = self.client.get(image_url(self.recipe.id),
+                              HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(body(res), CONTENT)
+
+    def test_if_none_match(self):
+        """Test an unchanged file answers 304"""
+
+        etag = self.client.get(image_url(self.recipe.id))['ETag']
+
+        res = self.client.get(image_url(self.recipe.id),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect',
+                       MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_accel_redirect(self):
+        """Test nginx is told which internal location to send"""
+
+        res = self.client.get(image_url(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Accel-Redirect'],
+                         '/protected-media/' + self.recipe.image.name)
+        self.assertEqual(res.content, b'')
+
+    @override_settings(MEDIA_SENDFILE='x-sendfile')
+    def test_sendfile(self):
+        """Test Apache is told which file to send"""
+
+        res = self.client.get(image_url(self.recipe.id))
+
+        self.assertEqual(res['X-Sendfile'], self.recipe.image.path)
+        self.assertEqual(res.content, b'')
@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredients-list')
+
+
+def sample_recipe(user, title="Sample recipe"):
+    """Create and return a sample recipe"""
+
+    return Recipe.objects.create(user=user, title=title,
+                                 time_minutes=10, price=5.00)
+
+
+class CursorPaginationTests(TestCase):
+    """Test keyset pagination on the recipe API"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "pagination@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, params):
+        """Follow `next` links and return every page's results"""
+
+        pages = []
+        res = self.client.get(url, params)
+
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append(res.data["results"])
+            if not res.data["next"]:
+                return pages
+            res = self.client.get(res.data["next"])
+
+    def test_recipes_paginated_newest_first(self):
+        """Test recipe pages cover every recipe once, newest first"""
+
+        recipes = [sample_recipe(self.user, f"Recipe {n}") for n in range(7)]
+
+        pages = self.walk(RECIPES_URL, {"page_size": 3})
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        ids = [item["id"] for page in pages for item in page]
+        self.assertEqual(ids, sorted([r.id for r in recipes], reverse=True))
+
+    def test_cursor_is_opaque(self):
+        """Test the next link carries an encoded cursor, not an offset"""
+
+        for n in range(3):
+            sample_recipe(self.user)
+
+        res = self.client.get(RECIPES_URL, {"page_size": 1})
+
+        self.assertIn("cursor=", res.data["next"])
+        self.assertNotIn("offset=", res.data["next"])
+        self.assertIsNone(res.data["previous"])
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+
+        res = self.client.get(RECIPES_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tags_paginated_by_name_with_duplicates(self):
+        """Test duplicate tag names are neither skipped nor repeated"""
+
+        for name in ["Lunch", "Lunch", "Lunch", "Dinner", "Brunch"]:
+            Tag.objects.create(user=self.user, name=name)
+
+        pages = self.walk(TAGS_URL, {"page_size": 2})
+
+        names = [item["name"] for page in pages for item in page]
+        ids = [item["id"] for page in pages for item in page]
+        self.assertEqual(names, ["Lunch"] * 3 + ["Dinner", "Brunch"])
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_assigned_only_distinct_under_cursor(self):
+        """Test assigned_only stays unique across pages"""
+
+        ingredients = [
+            Ingredients.objects.create(user=self.user, name=name)
+            for name in ["Apple", "Butter", "Flour", "Sugar"]
+        ]
+        for n in range(3):
+            recipe = sample_recipe(self.user)
+            recipe.ingredients.add(*ingredients[:3])
+
+        pages = self.walk(INGREDIENTS_URL,
+                          {"assigned_only": 1, "page_size": 2})
+
+        names = [item["name"] for page in pages for item in page]
+        self.assertEqual(names, ["Flour", "Butter", "Apple"])
+
+    def test_later_pages_cost_the_same(self):
+        """Test fetching a deep page runs the same queries as page one"""
+
+        for n in range(20):
+            sample_recipe(self.user)
+
+        with CaptureQueriesContext(connection) as first:
+            res = self.client.get(RECIPES_URL, {"page_size": 2})
+
+        for n in range(5):
+            res = self.client.get(res.data["next"])
+
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(res.data["next"])
+
+        self.assertEqual(len(first), len(deep))
+        self.assertNotIn("OFFSET", deep.captured_queries[0]["sql"])
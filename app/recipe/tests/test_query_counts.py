@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredients-list')
+
+
+def detail_url(recipe_id):
+    """:return recipe detail url"""
+
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def sample_recipe(user, index, fan_out=3):
+    """Create a recipe with `fan_out` tags and ingredients attached"""
+
+    recipe = Recipe.objects.create(user=user, title=f"Recipe {index}",
+                                   time_minutes=10, price=5.00)
+    for n in range(fan_out):
+        recipe.tag.add(
+            Tag.objects.create(user=user, name=f"Tag {index}-{n}"))
+        recipe.ingredients.add(
+            Ingredients.objects.create(user=user, name=f"Ingr {index}-{n}"))
+
+    return recipe
+
+
+class QueryBudgetTests(TestCase):
+    """Test that query counts do not grow with the size of the result"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "query_budget@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url, params=None):
+        """Return the number of queries run while fetching `url`"""
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def assert_constant_queries(self, url, params=None):
+        """Test that `url` costs the same after adding more recipes"""
+
+        sample_recipe(self.user, 0)
+        small = self.count_queries(url, params)
+
+        for index in range(1, 10):
+            sample_recipe(self.user, index)
+        large = self.count_queries(url, params)
+
+        self.assertEqual(small, large)
+
+    def test_recipe_list_queries_constant(self):
+        """Test recipe list query count is independent of result size"""
+
+        self.assert_constant_queries(RECIPES_URL)
+
+    def test_recipe_list_filtered_queries_constant(self):
+        """Test filtered recipe list query count is constant"""
+
+        tag = Tag.objects.create(user=self.user, name="Shared")
+        ingredient = Ingredients.objects.create(user=self.user, name="Salt")
+        params = {"tags": tag.id, "ingredients": ingredient.id}
+
+        recipe = sample_recipe(self.user, 0)
+        recipe.tag.add(tag)
+        recipe.ingredients.add(ingredient)
+        small = self.count_queries(RECIPES_URL, params)
+
+        for index in range(1, 10):
+            recipe = sample_recipe(self.user, index)
+            recipe.tag.add(tag)
+            recipe.ingredients.add(ingredient)
+        large = self.count_queries(RECIPES_URL, params)
+
+        self.assertEqual(small, large)
+
+    def test_recipe_detail_queries_constant(self):
+        """Test recipe detail query count is independent of fan-out"""
+
+        small = self.count_queries(
+            detail_url(sample_recipe(self.user, 0, fan_out=1).id))
+        large = self.count_queries(
+            detail_url(sample_recipe(self.user, 1, fan_out=20).id))
+
+        self.assertEqual(small, large)
+
+    def test_tag_list_queries_constant(self):
+        """Test tag list query count is independent of result size"""
+
+        self.assert_constant_queries(TAGS_URL)
+        self.assert_constant_queries(TAGS_URL, {"assigned_only": 1})
+
+    def test_ingredient_list_queries_constant(self):
+        """Test ingredient list query count is independent of result size"""
+
+        self.assert_constant_queries(INGREDIENTS_URL)
+        self.assert_constant_queries(INGREDIENTS_URL, {"assigned_only": 1})
@@ -91,7 +91,7 @@ class PrivateRecipeAPI(TestCase):
 
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_recipe_limited_to_user(self):
         """Test to limit the user specific recipes"""
@@ -109,8 +109,8 @@ class PrivateRecipeAPI(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_view_recipe_detail(self):
         """Test viewing detail page for recipe"""
@@ -246,9 +246,9 @@ class RecipeImageUpoadTests(TestCase):
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_filter_recipe_by_ingredients(self):
         """test recipe filter by ingredients"""
@@ -272,6 +272,6 @@ class RecipeImageUpoadTests(TestCase):
         serialiazer2 = RecipeSerializer(recipe2)
         serialiazer3 = RecipeSerializer(recipe3)
 
-        self.assertIn(serialiazer1.data, res.data)
-        self.assertIn(serialiazer2.data, res.data)
-        self.assertNotIn(serialiazer3.data, res.data)
+        self.assertIn(serialiazer1.data, res.data["results"])
+        self.assertIn(serialiazer2.data, res.data["results"])
+        self.assertNotIn(serialiazer3.data, res.data["results"])
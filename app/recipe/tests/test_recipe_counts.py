@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredients-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def sample_recipe(user, tags=(), ingredients=()):
+    """Create a recipe linked to the given tags and ingredients"""
+
+    recipe = Recipe.objects.create(user=user, title="Sample recipe",
+                                   time_minutes=10, price=5.00)
+    recipe.tag.add(*tags)
+    recipe.ingredients.add(*ingredients)
+
+    return recipe
+
+
+class RecipeCountTests(TestCase):
+    """Test recipe_count on tags and ingredients"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "counts@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        self.veg = Tag.objects.create(user=self.user, name="Veg")
+        self.quick = Tag.objects.create(user=self.user, name="Quick")
+        self.salt = Ingredients.objects.create(user=self.user, name="Salt")
+
+    def counts(self, url, params=None):
+        """:return {name: recipe_count} listed at url"""
+
+        res = self.client.get(url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return {item["name"]: item["recipe_count"]
+                for item in res.data["results"]}
+
+    def test_recipe_count_listed(self):
+        """Test tags and ingredients show how many recipes use them"""
+
+        sample_recipe(self.user, tags=(self.veg, self.quick),
+                      ingredients=(self.salt,))
+        sample_recipe(self.user, tags=(self.veg,), ingredients=(self.salt,))
+
+        self.assertEqual(self.counts(TAGS_URL), {"Veg": 2, "Quick": 1})
+        self.assertEqual(self.counts(INGREDIENTS_URL), {"Salt": 2})
+
+    def test_assigned_only_with_counts(self):
+        """Test assigned_only lists each used tag once with its count"""
+
+        sample_recipe(self.user, tags=(self.veg,))
+        sample_recipe(self.user, tags=(self.veg,))
+
+        self.assertEqual(self.counts(TAGS_URL, {"assigned_only": 1}),
+                         {"Veg": 2})
+
+    def test_single_query_without_join(self):
+        """Test counts and assigned_only need no join or DISTINCT"""
+
+        sample_recipe(self.user, tags=(self.veg, self.quick))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(TAGS_URL, {"assigned_only": 1})
+
+        tag_queries = [query["sql"] for query in ctx.captured_queries
+                       if 'FROM "core_tag"' in query["sql"]]
+        self.assertEqual(len(tag_queries), 1)
+        self.assertNotIn("DISTINCT", tag_queries[0])
+        self.assertNotIn("JOIN", tag_queries[0])
+
+    def test_recipe_delete_changes_etag(self):
+        """Test deleting a recipe refreshes counts for revalidating clients"""
+
+        recipe = sample_recipe(self.user, tags=(self.veg,))
+        etag = self.client.get(TAGS_URL)["ETag"]
+
+        recipe.delete()
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.counts(TAGS_URL), {"Veg": 0, "Quick": 0})
+
+    def test_bulk_created_recipes_counted(self):
+        """Test links written by bulk create update the counts"""
+
+        etag = self.client.get(TAGS_URL)["ETag"]
+        payload = [{"title": f"Recipe {n}", "time_minutes": 5,
+                    "price": "1.00", "tag": [self.veg.id],
+                    "ingredients": []} for n in range(3)]
+
+        self.client.post(RECIPES_URL, payload, format="json")
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.counts(TAGS_URL), {"Veg": 3, "Quick": 0})
+
+    def test_created_tag_has_no_recipes(self):
+        """Test a new tag is returned with recipe_count 0"""
+
+        res = self.client.post(TAGS_URL, {"name": "Dessert"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["recipe_count"], 0)
@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def payload(**params):
+    """:return a recipe create payload"""
+
+    defaults = {"title": "Biryani", "time_minutes": 45, "price": "8.00",
+                "tag": [], "ingredients": []}
+    defaults.update(params)
+
+    return defaults
+
+
+class UserOwnedRelationTests(TestCase):
+    """Test batched, user scoped tag and ingredient ids"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "relations@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def test_ingredients_resolved_in_one_query(self):
+        """Test 40 ingredient ids are looked up with one query"""
+
+        ingredients = [
+            Ingredients.objects.create(user=self.user, name=f"Spice {n}")
+            for n in range(40)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(RECIPES_URL, payload(
+                ingredients=[ingredient.id for ingredient in ingredients]),
+                format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        # the other reads join the through table to link and render
+        lookups = [query for query in ctx.captured_queries
+                   if 'FROM "core_ingredients" WHERE' in query["sql"]]
+        self.assertEqual(len(lookups), 1)
+        recipe = Recipe.objects.get(id=res.data["id"])
+        self.assertEqual(recipe.ingredients.count(), 40)
+
+    def test_other_users_ids_rejected(self):
+        """Test ids of another user's tags are reported as missing"""
+
+        other = get_user_model().objects.create_user(
+            "other-relations@gmail.com", "password123")
+        foreign = Tag.objects.create(user=other, name="Secret")
+        own = Tag.objects.create(user=self.user, name="Mine")
+
+        res = self.client.post(RECIPES_URL, payload(
+            tag=[own.id, foreign.id, 9999]), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(foreign.id), res.data["tag"][0])
+        self.assertIn("9999", res.data["tag"][0])
+        self.assertNotIn(str([own.id]), res.data["tag"][0])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_repeated_ids_accepted(self):
+        """Test an id submitted twice links the tag once"""
+
+        tag = Tag.objects.create(user=self.user, name="Spicy")
+
+        res = self.client.post(RECIPES_URL, payload(tag=[tag.id, tag.id]),
+                               format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["tag"], [tag.id])
+
+    def test_incorrect_type(self):
+        """Test non key values are rejected"""
+
+        res = self.client.post(RECIPES_URL, payload(tag=[{"id": 1}]),
+                               format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tag", res.data)
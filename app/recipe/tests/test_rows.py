@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.models import Recipe, Tag, Ingredients
+from recipe import rows
+from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def detail_url(recipe_id):
+    """:return recipe detail url"""
+
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def ordered_recipes(user):
+    """:return the user's recipes with related objects ordered by id"""
+
+    return Recipe.objects.filter(user=user).order_by("-id").prefetch_related(
+        Prefetch("tag", queryset=Tag.objects.order_by("id")),
+        Prefetch("ingredients", queryset=Ingredients.objects.order_by("id")))
+
+
+class RecipeRowsTests(TestCase):
+    """Test values() rendering matches the recipe serializers exactly"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "rows@gmail.com", "password123")
+        self.request = APIRequestFactory().get(RECIPES_URL)
+        tags = [Tag.objects.create(user=self.user, name=f"Tag {n}")
+                for n in range(3)]
+        ingredients = [
+            Ingredients.objects.create(user=self.user, name=f"Ingr {n}")
+            for n in range(3)]
+
+        self.recipe = Recipe.objects.create(
+            user=self.user, title="Curry", time_minutes=30, price=12.5,
+            link="https://example.com/curry", image="uploads/recipe/a.jpg",
+            thumbnail="uploads/recipe/thumbnails/a.jpg",
+            image_status=Recipe.IMAGE_READY)
+        self.recipe.tag.add(tags[2], tags[0])
+        self.recipe.ingredients.add(*ingredients)
+
+        other = Recipe.objects.create(user=self.user, title="Tea",
+                                      time_minutes=5, price=1)
+        other.tag.add(tags[1])
+        Recipe.objects.create(user=self.user, title="Water",
+                              time_minutes=0, price=0.05)
+
+    def render(self, data):
+        """:return JSON bytes of data"""
+
+        return JSONRenderer().render(data)
+
+    def test_list_identical(self):
+        """Test list rows render to the same bytes as RecipeSerializer"""
+
+        queryset = ordered_recipes(self.user)
+        expected = RecipeSerializer(queryset, many=True,
+                                    context={"request": self.request}).data
+
+        data = rows.render(list(rows.values(queryset, rows.LIST_FIELDS)),
+                           self.request)
+
+        self.assertEqual(self.render(data), self.render(expected))
+
+    def test_detail_identical(self):
+        """Test detail rows match RecipeDetailSerializer, image URLs too"""
+
+        queryset = ordered_recipes(self.user)
+        for recipe in queryset:
+            expected = RecipeDetailSerializer(
+                recipe, context={"request": self.request}).data
+            row = rows.values(queryset, rows.DETAIL_FIELDS).get(pk=recipe.pk)
+
+            data = rows.render([row], self.request, detail=True)[0]
+
+            self.assertEqual(self.render(data), self.render(expected))
+
+    def test_detail_identical_without_request(self):
+        """Test relative image URLs are used without a request"""
+
+        expected = RecipeDetailSerializer(self.recipe).data
+        row = rows.values(Recipe.objects.all(), rows.DETAIL_FIELDS).\
+            get(pk=self.recipe.pk)
+
+        data = rows.render([row], detail=True)[0]
+
+        self.assertEqual(self.render(data), self.render(expected))
+
+    def test_api_uses_rows(self):
+        """Test the list and detail endpoints return the row rendering"""
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(RECIPES_URL)
+        expected = RecipeSerializer(ordered_recipes(self.user), many=True,
+                                    context={"request": res.wsgi_request})
+        self.assertEqual(res.data["results"], expected.data)
+
+        res = client.get(detail_url(self.recipe.id))
+        expected = RecipeDetailSerializer(
+            ordered_recipes(self.user).get(pk=self.recipe.pk),
+            context={"request": res.wsgi_request})
+        self.assertEqual(res.data, expected.data)
+
+    def test_list_query_count(self):
+        """Test a page costs one query plus one per relation"""
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with self.assertNumQueries(3):
+            client.get(RECIPES_URL)
@@ -0,0 +1,138 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from recipe.search import has_trigram, search_recipes
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+is_postgresql = connection.vendor == 'postgresql'
+
+
+def sample_recipe(user, title):
+    """Create and return a sample recipe"""
+
+    return Recipe.objects.create(user=user, title=title,
+                                 time_minutes=10, price=5.00)
+
+
+class RecipeSearchTests(TestCase):
+    """Test searching recipes by title"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "search@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+
+    def search(self, term, **params):
+        """:return titles returned for a search"""
+
+        res = self.client.get(RECIPES_URL, {"search": term, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [item["title"] for item in res.data["results"]]
+
+    def test_search_filters_by_title(self):
+        """Test only recipes with a matching title are returned"""
+
+        sample_recipe(self.user, "Butter Chicken")
+        sample_recipe(self.user, "Fish Curry")
+
+        self.assertEqual(self.search("chicken"), ["Butter Chicken"])
+
+    def test_search_limited_to_user(self):
+        """Test search never returns other users' recipes"""
+
+        other = get_user_model().objects.create_user(
+            "search_other@gmail.com", "password123")
+        sample_recipe(other, "Chicken Soup")
+
+        self.assertEqual(self.search("chicken"), [])
+
+    def test_blank_search_ignored(self):
+        """Test a blank search returns the whole list"""
+
+        sample_recipe(self.user, "Butter Chicken")
+        sample_recipe(self.user, "Fish Curry")
+
+        self.assertEqual(len(self.search("  ")), 2)
+
+    @skipUnless(is_postgresql, "full-text search needs PostgreSQL")
+    def test_search_matches_word_stems(self):
+        """Test plural and stemmed forms match"""
+
+        sample_recipe(self.user, "Roast Chicken")
+
+        self.assertEqual(self.search("chickens roasted"), ["Roast Chicken"])
+
+    @skipUnless(is_postgresql, "full-text search needs PostgreSQL")
+    def test_search_ranked_by_relevance(self):
+        """Test better matches come first, across pages"""
+
+        sample_recipe(self.user, "Chicken Chicken Chicken")
+        sample_recipe(self.user, "Chicken pie with a long list of extras")
+        sample_recipe(self.user, "Chicken Chicken Wings")
+
+        first = self.client.get(RECIPES_URL,
+                                {"search": "chicken", "page_size": 2})
+        second = self.client.get(first.data["next"])
+        titles = [item["title"]
+                  for res in (first, second) for item in res.data["results"]]
+
+        self.assertEqual(titles, [
+            "Chicken Chicken Chicken",
+            "Chicken Chicken Wings",
+            "Chicken pie with a long list of extras",
+        ])
+
+    @skipUnless(is_postgresql, "full-text search needs PostgreSQL")
+    def test_search_pages_without_duplicates(self):
+        """Test walking every page of a search returns each match once"""
+
+        # ts_rank gives these titles float4 ranks that are below their
+        # shortest decimal form, a cursor at such a rank must not
+        # return the row it points at again
+        for words in [5, 4, 4] + [1] * 5:
+            sample_recipe(self.user, " ".join(["Chicken"] * words))
+
+        seen = []
+        url, params = RECIPES_URL, {"search": "chicken", "page_size": 3}
+        while url:
+            res = self.client.get(url, params)
+            seen += [item["id"] for item in res.data["results"]]
+            url, params = res.data["next"], None
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), 8)
+
+    @skipUnless(is_postgresql, "full-text search needs PostgreSQL")
+    def test_search_uses_full_text_index(self):
+        """Test the full-text filter can use the expression index"""
+
+        queryset = search_recipes(Recipe.objects.all(), "chicken", connection)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        self.assertIn("core_recipe_title_fts", plan)
+
+    @skipUnless(is_postgresql, "trigram search needs PostgreSQL")
+    def test_search_tolerates_typos(self):
+        """Test misspelled terms still match through trigrams"""
+
+        if not has_trigram(connection):
+            self.skipTest("trigram search needs the pg_trgm extension")
+
+        sample_recipe(self.user, "Chocolate Brownies")
+
+        self.assertEqual(self.search("choclate"), ["Chocolate Brownies"])
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredients
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def detail_url(recipe_id):
+    """:return recipe detail url"""
+
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+class SparseFieldsTests(TestCase):
+    """Test ?fields= and ?exclude= trim responses and queries"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "sparse@gmail.com", "password123")
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name="Vegan")
+        self.recipe = Recipe.objects.create(
+            user=self.user, title="Curry", time_minutes=30, price=12.5,
+            link="https://example.com/curry")
+        self.recipe.tag.add(self.tag)
+        self.recipe.ingredients.add(
+            Ingredients.objects.create(user=self.user, name="Rice"))
+
+    def get(self, url, params):
+        """:return (response, SQL of the queries it ran)"""
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, params)
+
+        return res, [query["sql"] for query in ctx.captured_queries]
+
+    def test_list_fields(self):
+        """Test only the chosen columns are selected and rendered"""
+
+        res, queries = self.get(RECIPES_URL,
+                                {"fields": "id,title,time_minutes"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [
+            {"id": self.recipe.id, "title": "Curry", "time_minutes": 30}])
+        recipe_queries = [sql for sql in queries
+                          if 'FROM "core_recipe" ' in sql]
+        self.assertEqual(len(recipe_queries), 1)
+        self.assertNotIn('"link"', recipe_queries[0])
+        self.assertNotIn('"price"', recipe_queries[0])
+        self.assertFalse([sql for sql in queries if "recipe_tag" in sql or
+                          "recipe_ingredients" in sql])
+
+    def test_list_exclude(self):
+        """Test excluded relations are neither rendered nor queried"""
+
+        res, queries = self.get(RECIPES_URL, {"exclude": "tag,link"})
+
+        self.assertEqual(list(res.data["results"][0]),
+                         ["id", "title", "ingredients", "time_minutes",
+                          "price"])
+        self.assertFalse([sql for sql in queries if "recipe_tag" in sql])
+
+    def test_detail_fields(self):
+        """Test ?fields= on a single recipe keeps detail representations"""
+
+        res = self.client.get(detail_url(self.recipe.id),
+                              {"fields": "tag,image"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            "tag": [{"id": self.tag.id, "name": "Vegan"}], "image": None})
+
+    def test_unknown_field(self):
+        """Test unknown names are reported"""
+
+        res = self.client.get(RECIPES_URL, {"fields": "id,secret",
+                                            "exclude": "image"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data, {"fields": ["Unknown fields: secret"],
+                                    "exclude": ["Unknown fields: image"]})
+
+    def test_tag_fields_skip_recipe_count(self):
+        """Test tags listed without recipe_count skip counting recipes"""
+
+        res, queries = self.get(TAGS_URL, {"fields": "id,name"})
+
+        self.assertEqual(res.data["results"], [
+            {"id": self.tag.id, "name": "Vegan"}])
+        tag_queries = [sql for sql in queries if 'FROM "core_tag"' in sql]
+        self.assertEqual(len(tag_queries), 1)
+        self.assertNotIn("recipe_tag", tag_queries[0])
+        self.assertNotIn('"user_id"', tag_queries[0].split("FROM")[0])
+
+    def test_tag_exclude_name(self):
+        """Test ?exclude= on tags keeps the other fields"""
+
+        res = self.client.get(TAGS_URL, {"exclude": "name"})
+
+        self.assertEqual(res.data["results"], [
+            {"id": self.tag.id, "recipe_count": 1}])
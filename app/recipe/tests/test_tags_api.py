@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 from django.test import TestCase
 
@@ -7,6 +8,7 @@ from rest_framework.test import APIClient
 
 from core.models import Tag, Recipe
 
+from recipe.filters import with_recipe_count
 from recipe.serializers import TagSerializer
 
 
@@ -36,6 +38,7 @@ class PrivateTagsApiTests(TestCase):
     Tests for authorized user for using API
     """
     def setUp(self):
+        cache.clear()
         self.user = get_user_model().objects.create_user(
             email="testuser@gmail.com", password="password123")
         self.client = APIClient()
@@ -54,7 +57,7 @@ class PrivateTagsApiTests(TestCase):
         serializer = TagSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_limited_to_user(self):
         """Test that tags returned for authenticated user"""
@@ -69,8 +72,8 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["name"], tag.name)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["name"], tag.name)
 
     def test_create_tag_success(self):
         """
@@ -114,10 +117,11 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
-        serializer1 = TagSerializer(tags1)
-        serializer2 = TagSerializer(tags2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        counted = with_recipe_count(Tag.objects.all()).in_bulk()
+        serializer1 = TagSerializer(counted[tags1.id])
+        serializer2 = TagSerializer(counted[tags2.id])
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     def test_retrieve_tags_assigned_unique(self):
         """Test filtering tags by assigned returns unique items"""
@@ -143,4 +147,4 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
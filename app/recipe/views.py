@@ -1,37 +1,115 @@
+from django.db import connection, transaction
+from django.http import Http404, StreamingHttpResponse
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
 
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 from core.models import Tag, Ingredients, Recipe
-from recipe import serializers
+from core import timing
+from core.db_router import read_from_replica
+from recipe import serializers, cache, conditional, images, export, rows, \
+    media, filters, sparse
+from recipe.search import search_recipes
+from recipe.pagination import RecipeCursorPagination, NameCursorPagination
+from user.authentication import CachedTokenAuthentication
 
 
-class BaseRecipeAttr(viewsets.GenericViewSet,
+class BulkCreateMixin:
+    """Accept a single object or a JSON array of objects on create"""
+
+    def create(self, request, *args, **kwargs):
+        """Validate the whole batch, then write it in one transaction"""
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            self.perform_create(serializer)
+
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED,
+                        headers=headers)
+
+
+class BaseRecipeAttr(BulkCreateMixin,
+                     viewsets.GenericViewSet,
                      mixins.ListModelMixin,
                      mixins.CreateModelMixin):
     """Base viewset for user owned recipe attributes"""
 
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated, )
+    pagination_class = NameCursorPagination
+
+    def selected_fields(self):
+        """:return fields chosen by ?fields= and ?exclude= on list, or None"""
+        if self.action != "list":
+            return None
+
+        return sparse.selected_fields(
+            self.request.query_params,
+            self.get_serializer_class().Meta.fields)
 
     def get_queryset(self):
-        """:return objects for current user authenticated user only"""
+        """
+        :return objects for current user authenticated user only, loading
+        only the selected fields. Pagination and validators need id, name
+        and updated_at.
+        """
         assigned_only = bool(
             int(self.request.query_params.get("assigned_only", 0)))
-        queryset = self.queryset
+        fields = self.selected_fields()
+        queryset = self.queryset.filter(user=self.request.user)
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = filters.assigned(queryset)
+
+        if fields is not None:
+            queryset = queryset.only(*sparse.model_columns(
+                self.queryset.model, fields, ("id", "name", "updated_at")))
+        if fields is None or "recipe_count" in fields:
+            queryset = filters.with_recipe_count(queryset)
+
+        return queryset.order_by("-name", "-id")
 
-        return queryset.\
-            filter(user=self.request.user).\
-            order_by("-name").distinct()
+    def get_serializer_context(self):
+        """Pass the selected fields on to the serializer"""
+        context = super().get_serializer_context()
+        context["fields"] = self.selected_fields()
+
+        return context
+
+    @read_from_replica
+    def list(self, request, *args, **kwargs):
+        """
+        Serve the rendered list from the per-user cache, or a 304 when
+        the client already holds it
+        """
+        def build():
+            page = self.paginate_queryset(
+                self.filter_queryset(self.get_queryset()))
+            serializer = self.get_serializer(page, many=True)
+            return {"state": conditional.page_state(page, self.paginator),
+                    "data": self.get_paginated_response(serializer.data).data}
+
+        model = self.queryset.model
+        cached = cache.get_or_build(cache.list_cache_key(model, request),
+                                    build,
+                                    cache.cacheable(model, request.user.pk))
+        etag, last_modified = conditional.list_validators(
+            request, model, cached["state"])
+
+        response = conditional.check(request, etag, last_modified) or \
+            Response(cached["data"])
+        return conditional.set_validators(response, etag, last_modified)
 
     def perform_create(self, serializer):
         """Create a new object"""
         serializer.save(user=self.request.user)
+        cache.invalidate(self.queryset.model, self.request.user.pk)
 
 
 class TagViewSets(BaseRecipeAttr):
@@ -49,11 +127,12 @@ class IngredientViewSets(BaseRecipeAttr):
     queryset = Ingredients.objects.all()
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(BulkCreateMixin, viewsets.ModelViewSet):
     serializer_class = serializers.RecipeSerializer
     queryset = Recipe.objects.all()
     permission_classes = (IsAuthenticated, )
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
+    pagination_class = RecipeCursorPagination
 
     def _parse_string_to_int(self, qs):
         """convert list of string to list of int"""
@@ -63,16 +142,25 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Retrieve the recipe for authentocated users"""
         tags = self.request.query_params.get("tags")
         ingredients = self.request.query_params.get("ingredients")
+        search = self.request.query_params.get("search", "").strip()
         queryset = self.queryset
+        if search:
+            queryset = search_recipes(queryset, search, connection)
+
         if tags:
             tag_ids = self._parse_string_to_int(tags)
-            queryset = queryset.filter(tag__id__in=tag_ids)
+            queryset = filters.filter_related(
+                queryset, "tag", tag_ids,
+                filters.parse_mode(self.request.query_params, "tags_mode"))
 
         if ingredients:
             ingredient_ids = self._parse_string_to_int(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            queryset = filters.filter_related(
+                queryset, "ingredients", ingredient_ids,
+                filters.parse_mode(self.request.query_params,
+                                   "ingredients_mode"))
 
-        return queryset.filter(user=self.request.user)
+        return queryset.filter(user=self.request.user).order_by("-id")
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -84,10 +172,127 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return self.serializer_class
 
+    @read_from_replica
+    def list(self, request, *args, **kwargs):
+        """
+        List recipes, or return 304 when the page is unchanged. Pages are
+        read as values() rows and rendered without model instances.
+        ?expand=tag,ingredients nests related names instead of ids, and
+        ?ids=1,2,3 retrieves those recipes instead, as the batch action.
+        """
+        if "ids" in request.query_params:
+            return self._batch_response(
+                request, {"ids": request.query_params["ids"].split(",")})
+
+        fields = sparse.selected_fields(
+            request.query_params, serializers.RecipeSerializer.Meta.fields)
+        expand = sparse.expanded(request.query_params, rows.RELATED_FIELDS)
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = self.paginator.get_ordering(request, queryset, self)
+        page = self.paginate_queryset(rows.values(
+            queryset, rows.columns(rows.LIST_FIELDS, fields), ordering))
+        etag, last_modified = conditional.list_validators(
+            request, Recipe, conditional.page_state(page, self.paginator))
+
+        response = conditional.check(request, etag, last_modified)
+        if response is None:
+            with timing.measure("serializer"):
+                data = rows.render(page, request, fields=fields,
+                                   expand=expand)
+            response = self.get_paginated_response(data)
+
+        return conditional.set_validators(response, etag, last_modified)
+
+    @read_from_replica
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a recipe, or return 304 when it is unchanged"""
+        fields = sparse.selected_fields(
+            request.query_params,
+            serializers.RecipeDetailSerializer.Meta.fields)
+        row = get_object_or_404(
+            rows.values(self.get_queryset(),
+                        rows.columns(rows.DETAIL_FIELDS, fields)),
+            pk=self.kwargs["pk"])
+        etag, last_modified = conditional.object_validators(request,
+                                                            Recipe, row)
+
+        response = conditional.check(request, etag, last_modified)
+        if response is None:
+            with timing.measure("serializer"):
+                data = rows.render([row], request, detail=True,
+                                   fields=fields)[0]
+            response = Response(data)
+
+        return conditional.set_validators(response, etag, last_modified)
+
+    def _batch_response(self, request, data):
+        """
+        :return the user's recipes with the requested ids in the requested
+        order, rendered as detail, and the ids that were not found
+        """
+        serializer = serializers.RecipeIdsSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+        fields = sparse.selected_fields(
+            request.query_params,
+            serializers.RecipeDetailSerializer.Meta.fields)
+
+        found = {row["id"]: row for row in rows.values(
+            Recipe.objects.filter(user=request.user, pk__in=ids),
+            rows.columns(rows.DETAIL_FIELDS, fields))}
+        with timing.measure("serializer"):
+            data = rows.render([found[pk] for pk in ids if pk in found],
+                               request, detail=True, fields=fields)
+
+        return Response({"results": data,
+                         "missing": [pk for pk in ids if pk not in found]})
+
+    @action(methods=['POST'], detail=False, url_path='batch')
+    @read_from_replica
+    def batch(self, request):
+        """Retrieve up to MAX_BATCH_RETRIEVE recipes posted as {"ids"}"""
+        return self._batch_response(request, request.data)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Update a recipe unless If-Match or If-Unmodified-Since show the
+        client edited an older version. The row stays locked from the
+        check until the update is written.
+        """
+        partial = kwargs.pop("partial", False)
+
+        with transaction.atomic():
+            instance = get_object_or_404(
+                self.get_queryset().select_for_update(),
+                pk=self.kwargs["pk"])
+            self.check_object_permissions(request, instance)
+
+            etag, last_modified = conditional.object_validators(
+                request, Recipe, instance)
+            response = conditional.check(request, etag, last_modified)
+            if response is not None:
+                return response
+
+            serializer = self.get_serializer(instance, data=request.data,
+                                             partial=partial)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+
+        etag, last_modified = conditional.object_validators(
+            request, Recipe, serializer.instance)
+        return conditional.set_validators(Response(serializer.data),
+                                          etag, last_modified)
+
     def perform_create(self, serializer):
         """perform create of object"""
         serializer.save(user=self.request.user)
 
+        if isinstance(serializer, ListSerializer):
+            # rows written in bulk send neither post_save nor m2m_changed
+            cache.invalidate(Recipe, self.request.user.pk)
+            cache.invalidate(Tag, self.request.user.pk)
+            cache.invalidate(Ingredients, self.request.user.pk)
+
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
         """Uplaod an image to recipe"""
@@ -95,8 +300,56 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(recipe, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            if recipe.thumbnail:
+                recipe.thumbnail.delete(save=False)
+            recipe = serializer.save(image_status=Recipe.IMAGE_PENDING)
+            images.schedule_processing(recipe)
 
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def _serve_media(self, request, field):
+        """Serve the image or thumbnail of one of the user's recipes"""
+        recipe = get_object_or_404(
+            Recipe.objects.filter(user=request.user).only("id", field),
+            pk=self.kwargs["pk"])
+
+        response = media.serve(request, getattr(recipe, field))
+        if response is None:
+            raise Http404
+
+        return response
+
+    @action(methods=['GET'], detail=True, url_path='image',
+            content_negotiation_class=media.IgnoreClientContentNegotiation)
+    def image(self, request, pk=None):
+        """Download the recipe image"""
+        return self._serve_media(request, "image")
+
+    @action(methods=['GET'], detail=True, url_path='thumbnail',
+            content_negotiation_class=media.IgnoreClientContentNegotiation)
+    def thumbnail(self, request, pk=None):
+        """Download the recipe thumbnail"""
+        return self._serve_media(request, "thumbnail")
+
+    @action(methods=['GET'], detail=False, url_path='export')
+    def export_recipes(self, request):
+        """Stream all of the user's recipes as NDJSON or CSV"""
+        export_format = request.query_params.get("export_format", "ndjson")
+        recipes = export.iter_recipes(request.user)
+
+        if export_format == "csv":
+            response = StreamingHttpResponse(export.csv_lines(recipes),
+                                             content_type="text/csv")
+        elif export_format == "ndjson":
+            response = StreamingHttpResponse(
+                export.ndjson_lines(recipes),
+                content_type="application/x-ndjson")
+        else:
+            return Response({"export_format": ["Expected csv or ndjson"]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        response["Content-Disposition"] = \
+            f'attachment; filename="recipes.{export_format}"'
+        return response
@@ -0,0 +1,58 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def token_cache_key(key):
+    """
+    :return cache key for a token, hashed so raw tokens never reach a
+    shared cache backend
+    """
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    return f'auth:token:{digest}'
+
+
+def evict_token(key):
+    """Drop a cached token lookup"""
+    cache.delete(token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the user id and is_active flag of a
+    token for AUTH_TOKEN_CACHE_TIMEOUT seconds, so repeat requests load
+    the user by primary key instead of joining through the Token table.
+    The user itself is never cached, keeping password hashes out of the
+    cache. Entries are evicted when the token is deleted or the user is
+    saved, see user/signals.py
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Return the (user, token) pair for the cached user id, falling
+        back to the database lookup on a miss
+        """
+        cache_key = token_cache_key(key)
+        cached = cache.get(cache_key)
+
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, (user.pk, user.is_active),
+                      getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 60))
+            return (user, token)
+
+        user_id, is_active = cached
+        user = get_user_model().objects.filter(pk=user_id).first() \
+            if is_active else None
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'))
+
+        return (user, Token(key=key, user=user))
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class PolicyPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 hashing with PASSWORD_PBKDF2_ITERATIONS rounds. It keeps
+    Django's algorithm name, so existing hashes verify unchanged, and a
+    hash made with any other count reports must_update, which makes
+    check_password store a new hash on the next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
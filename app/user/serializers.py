@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import ugettext_lazy as _
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
+
+from user import throttling
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -53,17 +56,25 @@ class AuthOTokenSeralizer(serializers.Serializer):
         """
         email = attrs.get('email')
         password = attrs.get('password')
+        request = self.context.get('request')
+        ip = throttling.client_ip(request)
+
+        # refuse before authenticate() spends a password hash on it
+        if throttling.blocked(email, ip):
+            raise exceptions.Throttled(wait=settings.LOGIN_FAILURE_WINDOW)
 
         user = authenticate(
-            request=self.context.get('request'),
+            request=request,
             email=email,
             password=password
         )
 
         if not user:
+            throttling.record_failure(email, ip)
             msg = _("Unable to authenticate the user with "
                     "provided credentials")
             raise serializers.ValidationError(msg, code="authentication")
 
+        throttling.reset(email)
         attrs['user'] = user
         return attrs
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import evict_token
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a token as soon as it is deleted"""
+
+    evict_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def evict_user_tokens(sender, instance, created, **kwargs):
+    """
+    Drop the cached tokens of a saved user so deactivation takes effect
+    immediately and cached users never go stale
+    """
+    if created:
+        return
+
+    for key in Token.objects.filter(user=instance).\
+            values_list('key', flat=True):
+        evict_token(key)
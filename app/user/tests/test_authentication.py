@@ -0,0 +1,117 @@
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import token_cache_key
+
+
+ME_URL = reverse('user:me')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test the cached token authentication class"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="cached_token@xyz.com",
+            password="testpass110",
+            name="name"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeat_request_skips_token_query(self):
+        """Test repeat requests load the user without the Token table"""
+
+        self.client.get(ME_URL)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn(Token._meta.db_table, ctx.captured_queries[0]["sql"])
+
+    def test_cache_shared_by_recipe_endpoints(self):
+        """Test recipe endpoints use the cached lookup too"""
+
+        self.client.get(ME_URL)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in ctx.captured_queries
+                          if Token._meta.db_table in query["sql"]])
+
+    def test_user_not_cached(self):
+        """Test only the user id and is_active are cached, not the user"""
+
+        self.client.get(ME_URL)
+
+        self.assertEqual(cache.get(token_cache_key(self.token.key)),
+                         (self.user.pk, True))
+
+    def test_raw_token_not_in_cache_key(self):
+        """Test the cache key does not contain the token itself"""
+
+        self.assertNotIn(self.token.key, token_cache_key(self.token.key))
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is still rejected"""
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_evicted(self):
+        """Test a deleted token stops working immediately"""
+
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_evicted(self):
+        """Test a deactivated user is rejected immediately"""
+
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_not_stale(self):
+        """Test a saved user is reloaded on the next request"""
+
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"name": "new name"})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["name"], "new name")
+
+    @override_settings(AUTH_TOKEN_CACHE_TIMEOUT=0)
+    def test_timeout_setting(self):
+        """Test the TTL comes from AUTH_TOKEN_CACHE_TIMEOUT"""
+
+        self.client.get(ME_URL)
+
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
@@ -0,0 +1,132 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+TOKEN_URL = reverse('user:token')
+
+
+@override_settings(LOGIN_FAILURE_ACCOUNT_LIMIT=3, LOGIN_FAILURE_IP_LIMIT=5,
+                   LOGIN_FAILURE_WINDOW=60)
+class LoginTests(TestCase):
+    """Test password rehashing and failed login limits"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "login@gmail.com", "password123")
+
+    def login(self, email="login@gmail.com", password="password123",
+              ip="10.0.0.1", **extra):
+        """:return the token endpoint response"""
+
+        return self.client.post(TOKEN_URL, {"email": email,
+                                            "password": password},
+                                REMOTE_ADDR=ip, **extra)
+
+    def test_rehash_on_login(self):
+        """Test a hash with an old iteration count is upgraded"""
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user.set_password("password123")
+            self.user.save()
+        self.assertIn("$1000$", self.user.password)
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1200):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1200$"))
+        self.assertTrue(self.user.check_password("password123"))
+
+    def test_account_limit(self):
+        """Test an account is refused without hashing after its limit"""
+
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            res = self.login(password="wrong", ip=ip)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with patch('user.serializers.authenticate') as authenticate:
+            res = self.login(ip="10.0.0.4")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+        authenticate.assert_not_called()
+
+    def test_account_limit_ignores_email_case(self):
+        """Test changing the email case does not dodge the limit"""
+
+        for email in ("LOGIN@gmail.com", "Login@Gmail.com", "login@gmail.com"):
+            self.login(email=email, password="wrong")
+
+        res = self.login(email="LoGiN@gmail.com")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_ip_limit(self):
+        """Test a client is refused after failing on many accounts"""
+
+        for n in range(5):
+            self.login(email=f"nobody{n}@gmail.com", password="wrong")
+
+        res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login(ip="10.0.0.9").status_code,
+                         status.HTTP_200_OK)
+
+    def test_spoofed_forwarded_for_ignored(self):
+        """Test a client cannot dodge the ip limit with X-Forwarded-For"""
+
+        for n in range(5):
+            self.login(email=f"nobody{n}@gmail.com", password="wrong",
+                       HTTP_X_FORWARDED_FOR=f"203.0.113.{n}")
+
+        res = self.login(HTTP_X_FORWARDED_FOR="203.0.113.99")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1})
+    def test_forwarded_for_behind_proxy(self):
+        """Test the proxy's X-Forwarded-For entry is used with NUM_PROXIES"""
+
+        for n in range(5):
+            self.login(email=f"nobody{n}@gmail.com", password="wrong",
+                       HTTP_X_FORWARDED_FOR="203.0.113.1")
+
+        blocked = self.login(HTTP_X_FORWARDED_FOR="203.0.113.1")
+        other = self.login(HTTP_X_FORWARDED_FOR="203.0.113.2")
+
+        self.assertEqual(blocked.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+
+    def test_success_resets_account_failures(self):
+        """Test a successful login clears the account's failures"""
+
+        self.login(password="wrong")
+        self.login(password="wrong")
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+        self.login(password="wrong")
+        self.login(password="wrong")
+
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    @override_settings(LOGIN_FAILURE_ACCOUNT_LIMIT=0,
+                       LOGIN_FAILURE_IP_LIMIT=0)
+    def test_limits_disabled(self):
+        """Test a limit of 0 never refuses"""
+
+        for _ in range(6):
+            self.login(password="wrong")
+
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
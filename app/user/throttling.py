@@ -0,0 +1,65 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+def _digest(value):
+    """:return sha256 hex digest, keeping emails out of cache keys"""
+
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def client_ip(request):
+    """
+    :return the client address. X-Forwarded-For is set by the client
+    unless a proxy rewrites it, so it is only read with NUM_PROXIES.
+    """
+    if not api_settings.NUM_PROXIES:
+        return request.META.get('REMOTE_ADDR', '')
+
+    return BaseThrottle().get_ident(request)
+
+
+def failure_keys(email, ip):
+    """:return {cache key: limit} of the account and client counters"""
+
+    return {
+        f'auth:failures:account:{_digest(email.strip().lower())}':
+            settings.LOGIN_FAILURE_ACCOUNT_LIMIT,
+        f'auth:failures:ip:{_digest(ip)}': settings.LOGIN_FAILURE_IP_LIMIT,
+    }
+
+
+def blocked(email, ip):
+    """
+    :return True if the account or the client reached its limit of
+    failed logins within the window. A limit of 0 disables it.
+    """
+    keys = failure_keys(email, ip)
+    counts = cache.get_many(keys)
+
+    return any(limit and counts.get(key, 0) >= limit
+               for key, limit in keys.items())
+
+
+def record_failure(email, ip):
+    """Count a failed login against the account and the client"""
+
+    for key in failure_keys(email, ip):
+        # the window starts with the first failure and is not extended
+        cache.add(key, 0, settings.LOGIN_FAILURE_WINDOW)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # expired between add and incr
+            cache.set(key, 1, settings.LOGIN_FAILURE_WINDOW)
+
+
+def reset(email, ip=None):
+    """Forget the failures of an account, and of a client if given"""
+
+    keys = list(failure_keys(email, ip or ''))
+    cache.delete_many(keys if ip is not None else keys[:1])
@@ -1,7 +1,8 @@
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
+from .authentication import CachedTokenAuthentication
 from .serializers import UserSerializer, AuthOTokenSeralizer
 
 
@@ -25,7 +26,7 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     Manage Authenticated user
     """
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):